@@ -30,19 +30,21 @@ import re
 
 import numpy
 import json
-import bz2
 import csv
 
 from platereader.plate import Plate
 from platereader.clsreplicate import ClsReplicate
 from platereader.statusmessage import StatusMessage, Severity
 from platereader.csvunicode import CsvFileUnicodeWriter
+from platereader.executor import getExecutor
+from platereader.serialisation import readCompressed, writeCompressed
 
 class Cls(object):
     """
     """
 
-    def __init__(self,files=None,days=None,serialisedFilename=None):
+    def __init__(self,files=None,days=None,serialisedFilename=None,executor=None,precision=None):
+        self._precision=precision
         if serialisedFilename is not None:
             self._loadLightweight(serialisedFilename)
         else:
@@ -52,12 +54,11 @@ class Cls(object):
                 raise Cls.Error('need days, one corresponding to each plate')
             if len(files) != len(days):
                 raise Cls.Error('need the same number of files and days (one corresponding to each plate)')
-            self._loadGatFiles(files,numpy.array(days,dtype=float))
+            self._loadGatFiles(files,numpy.array(days,dtype=float),executor=executor)
         self.modified=False
 
     def _loadLightweight(self,filename):
-        with bz2.BZ2File(filename, 'r') as rfile:
-            pickled=rfile.read().decode("utf-8")
+        pickled=readCompressed(filename).decode("utf-8")
 
         try:
             unpickled = json.loads(pickled)
@@ -102,12 +103,16 @@ class Cls(object):
 
         return sr
 
-    def saveLightweight(self,filename):
+    def saveLightweight(self,filename,compression='bz2',compressionLevel=None):
         """
         Partially serialise CLS data and save to file.
 
         :param filename: Name of the file.
         :type filename: str
+        :param compression: 'bz2', 'gzip', 'zlib', 'lzma' or None (see :py:func:`serialisation.writeCompressed <platereader.serialisation.writeCompressed>`).
+        :type compression: str
+        :param compressionLevel: Compression level from 0 to 9, lower is faster.
+        :type compressionLevel: int
 
         :return: StatusMessage/None -- non-fatal notifications.
 
@@ -119,8 +124,7 @@ class Cls(object):
         status = None
         pickled = json.dumps(sr)
 
-        with bz2.BZ2File(filename, 'w') as wfile:
-            wfile.write(pickled.encode('utf-8'))
+        writeCompressed(filename,pickled.encode('utf-8'),compression,compressionLevel)
 
         self.modified=False
         return status
@@ -168,11 +172,14 @@ class Cls(object):
             clstc._deserialiseLightweight(unpickled['clsReplicateGroups'][clsidx])
             clsidx+=1
 
-    def _loadGatFiles(self,files,days):
+    def _loadGatFiles(self,files,days,executor=None):
         """
         Reads data from GAT files and sets up 
 
         For internal use only.
+
+        :param executor: Executor loading the files (see :py:mod:`platereader.executor`).
+        :type executor: SerialExecutor or str
         """
         self.days = days
         self.files = files
@@ -184,9 +191,9 @@ class Cls(object):
                 missingfiles.append(f)
         if len(missingfiles) > 0:
             raise Cls.PlateFileDoesNotExist(missingfiles)
-        for f in self.files:
-            self.plates.append(Plate(filename=f,fileformat='gat'))
-            self.plates[-1].verbose=False
+        self.plates=getExecutor(executor).map(_loadGatFileWorker,self.files,context=self._precision)
+        for plate in self.plates:
+            plate.verbose=False
 
         self.clsWells=[]
         # we use the sampleid/conditions tuples from the first plate to initialise this cls analyser
@@ -421,3 +428,11 @@ class Cls(object):
             else:
                 message+='.'
             return message
+
+def _loadGatFileWorker(context,filename):
+    """
+    Load a GAT file for :py:meth:`Cls._loadGatFiles <.Cls._loadGatFiles>`.
+
+    For internal use only.
+    """
+    return Plate(filename=filename,fileformat='gat',precision=context)
@@ -39,13 +39,18 @@ from platereader.plate import Plate
 from platereader.odplot import twentysixColours
 from platereader.statusmessage import StatusMessage, Severity
 from platereader.numpytools import nonNanSqrt
+from platereader.executor import getExecutor
 
-def viabilityToMatplotlib(repl,fig,showTitle=False,addWellIdsToTitle=False,verbose=False,color=None,viabilityInPercent=True):
+def viabilityToMatplotlib(repl,fig,showTitle=False,addWellIdsToTitle=False,verbose=False,color=None,viabilityInPercent=True,
+                          viability=None):
     """
     Show viabilities of a ClsReplicate on a matplotlib figure.
 
     FIXME enhance documentation of parameters.
 
+    :param viability: Result of repl.viability() if it was already calculated.
+    :type viability: tuple
+
     :return: StatusMessage -- Statuses of this dataset.
     """
     legendprop={'size': 0}
@@ -65,7 +70,9 @@ def viabilityToMatplotlib(repl,fig,showTitle=False,addWellIdsToTitle=False,verbo
         title="\n".join(textwrap.wrap(title, 100))
         ax.set_title(title)
 
-    days, viability, viabilityvar, status = repl.viability()
+    if viability is None:
+        viability=repl.viability()
+    days, viability, viabilityvar, status = viability
     if verbose:
         print('viability   '+str(viability))
     if viability is not None:
@@ -100,9 +107,13 @@ def viabilitiesToPdf(clsplate,pdfout,
                      replicateGroupIndices=[],elementaryIndices=[],
                      creator=None,
                      showTitle=True, addWellIdsToTitle=True,
-                     progressCall=None):
+                     progressCall=None,
+                     executor=None):
     """
     Create a multi-page pdf with viability plots.
+
+    :param executor: Executor calculating the viabilities before plotting (see :py:mod:`platereader.executor`).
+    :type executor: SerialExecutor or str
     """
     if replicateGroupIndices == [] and elementaryIndices == []:
         # nothing given, we will create a pdf containing all non-background replicate groups
@@ -110,6 +121,14 @@ def viabilitiesToPdf(clsplate,pdfout,
 
     num=len(elementaryIndices)+len(replicateGroupIndices)
 
+    # plotting itself is serial, but the viabilities can be calculated beforehand
+    executor=getExecutor(executor)
+    items=[(False,clstcidx) for clstcidx in elementaryIndices]+[(True,clstcidx) for clstcidx in replicateGroupIndices]
+    if executor.parallel:
+        viabilities=executor.map(_viabilityWorker,items,context=clsplate)
+    else:
+        viabilities=[None for item in items]
+
     with contextlib.closing(matplotlib.backends.backend_pdf.PdfPages(pdfout)) as pdfp:
         figall = matplotlib.figure.Figure()
         canvas = matplotlib.backends.backend_pdf.FigureCanvasPdf(figall)
@@ -125,7 +144,8 @@ def viabilitiesToPdf(clsplate,pdfout,
     
             figclstc = matplotlib.figure.Figure()
             canvas = matplotlib.backends.backend_pdf.FigureCanvasPdf(figclstc) # NOTE this needs to be called to set the the canvas of figclstc
-            status = viabilityToMatplotlib(clsplate.clsWells[clstcidx],figclstc,showTitle=showTitle,addWellIdsToTitle=addWellIdsToTitle)
+            status = viabilityToMatplotlib(clsplate.clsWells[clstcidx],figclstc,showTitle=showTitle,addWellIdsToTitle=addWellIdsToTitle,
+                                           viability=viabilities[allcnt])
             figclstc.savefig(pdfp,format="pdf",bbox_inches='tight')
             pdftitle+=clsplate.clsWells[clstcidx].sampleid+" "+clsplate.clsWells[clstcidx].condition    
 
@@ -137,7 +157,8 @@ def viabilitiesToPdf(clsplate,pdfout,
 
             figclstc = matplotlib.figure.Figure()
             canvas = matplotlib.backends.backend_pdf.FigureCanvasPdf(figclstc) # NOTE this needs to be called to set the the canvas of figclstc
-            status = viabilityToMatplotlib(clsplate.clsReplicateGroups[clstcidx],figclstc,showTitle=showTitle,addWellIdsToTitle=addWellIdsToTitle)
+            status = viabilityToMatplotlib(clsplate.clsReplicateGroups[clstcidx],figclstc,showTitle=showTitle,addWellIdsToTitle=addWellIdsToTitle,
+                                           viability=viabilities[allcnt])
             figclstc.savefig(pdfp,format="pdf",bbox_inches='tight')
             pdftitle+=clsplate.clsReplicateGroups[clstcidx].sampleid+" "+clsplate.clsReplicateGroups[clstcidx].condition    
 
@@ -150,6 +171,17 @@ def viabilitiesToPdf(clsplate,pdfout,
         if creator is not None:
             d['Creator'] = creator
 
+def _viabilityWorker(clsplate,item):
+    """
+    Return the viability of a cls well or replicate group for :py:func:`viabilitiesToPdf`.
+
+    For internal use only.
+    """
+    isReplicateGroup, clstcidx = item
+    if isReplicateGroup:
+        return clsplate.clsReplicateGroups[clstcidx].viability()
+    return clsplate.clsWells[clstcidx].viability()
+
 def survivalIntegralsToPdf(cls,pdfout,progressCall=None,conditions=None,samples=None,sampleIdToLabel=None,conditionToLabel=None):
     """
     Create barplots of survival integrals (pdf).
@@ -29,7 +29,7 @@ import math
 import numpy
 
 from platereader.replicate import Replicate
-from platereader.numpytools import maskedArrayToMeanVar
+from platereader.numpytools import nanMeanVar
 from platereader.statusmessage import StatusMessage, Severity
 
 class ClsReplicate(object):
@@ -281,7 +281,7 @@ class ClsReplicate(object):
                 allstatuses.addStatus(self.initDiffStatus)
                 return None, None, None, allstatuses
 
-            viabilitymean, viabilityvar = maskedArrayToMeanVar(viability, idcs=idcs, ddof=1, axis=0)
+            viabilitymean, viabilityvar = nanMeanVar(viability, idcs=idcs, ddof=1, axis=0)
 
             statuses.addStatus(self.initDiffStatus)
             return self.days, viabilitymean, viabilityvar, statuses
@@ -352,7 +352,7 @@ class ClsReplicate(object):
                 allstatuses.addStatus(self.initDiffStatus)
                 return None, None, allstatuses
 
-            simean, sivar = maskedArrayToMeanVar(si, ddof=1)
+            simean, sivar = nanMeanVar(si, ddof=1)
 
             statuses.addStatus(self.initDiffStatus)
             return simean, sivar, statuses
@@ -0,0 +1,208 @@
+"""
+This module implements executors that run independent tasks serially, in threads or in processes.
+
+Growth Analysis Tool for High-throughput Optical Density Experiments
+(GATHODE) executors used by exports, plotting and CLS loading.
+
+The kind of the default executor and its number of workers can be
+set with the environment variables GATHODE_EXECUTOR ('serial',
+'threads' or 'processes'; defaults to 'serial') and GATHODE_WORKERS
+(defaults to the number of CPUs).
+"""
+
+# GATHODE  Growth Analysis Tool
+#          for High-throughput Optical Density Experiments
+#
+# Copyright (C) 2014 Nils Christian
+#
+# This file is part of GATHODE.
+#
+# GATHODE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# GATHODE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with GATHODE.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+import multiprocessing
+import multiprocessing.pool
+
+# held while the warnings filters are changed or warnings are
+# recorded; they are process-wide, i.e. shared by all threads
+warningsLock=threading.RLock()
+
+def defaultNumWorkers():
+    """
+    Return the number of workers used when none is given.
+
+    :return: int -- value of environment variable GATHODE_WORKERS or the number of CPUs.
+    """
+    if 'GATHODE_WORKERS' in os.environ:
+        try:
+            workers=int(os.environ['GATHODE_WORKERS'])
+        except ValueError:
+            raise RuntimeError('GATHODE_WORKERS should be an integer, not "'+os.environ['GATHODE_WORKERS']+'"')
+        if workers < 1:
+            raise RuntimeError('GATHODE_WORKERS should be at least 1')
+        return workers
+    return multiprocessing.cpu_count()
+
+class SerialExecutor(object):
+    """
+    Runs tasks one after the other in the calling thread.
+    """
+
+    parallel=False
+
+    def __init__(self,workers=None):
+        self.workers=1
+
+    def map(self,fn,items,context=None,progressCall=None):
+        """
+        Call fn(context,item) for each item.
+
+        :param fn: Function called for each item. For :py:class:`ProcessExecutor` it has to be picklable (i.e. defined at module level).
+        :type fn: @fun(context,item)
+        :param items: The items.
+        :type items: list
+        :param context: Data shared by all calls. :py:class:`ProcessExecutor` sends it once to each process.
+        :param progressCall: Function that will be called on each item (in order).
+        :type progressCall: @fun(int)
+
+        :return: list -- results in the order of the items.
+        """
+        results=[]
+        cnt=-1
+        for item in items:
+            cnt+=1
+            if progressCall is not None:
+                progressCall(cnt)
+            results.append(fn(context,item))
+        return results
+
+class ThreadExecutor(SerialExecutor):
+    """
+    Runs tasks in a pool of threads.
+    """
+
+    parallel=True
+
+    def __init__(self,workers=None):
+        self.workers=workers if workers is not None else defaultNumWorkers()
+
+    def map(self,fn,items,context=None,progressCall=None):
+        """
+        Call fn(context,item) for each item.
+
+        See :py:meth:`SerialExecutor.map <.SerialExecutor.map>`.
+        progressCall is called from the calling thread whenever the
+        result of the next item (in order) is available.
+        """
+        if self.workers < 2:
+            return SerialExecutor.map(self,fn,items,context,progressCall)
+        pool=multiprocessing.pool.ThreadPool(self.workers)
+        try:
+            return _collect(pool.imap(lambda item: fn(context,item),items),progressCall)
+        finally:
+            pool.close()
+            pool.join()
+
+class ProcessExecutor(SerialExecutor):
+    """
+    Runs tasks in a pool of processes.
+
+    Functions, items, context and results are pickled, so changes
+    the tasks make to the context (e.g. memoised results) are not
+    seen by the caller.
+    """
+
+    parallel=True
+
+    def __init__(self,workers=None):
+        self.workers=workers if workers is not None else defaultNumWorkers()
+
+    def map(self,fn,items,context=None,progressCall=None):
+        """
+        Call fn(context,item) for each item.
+
+        See :py:meth:`SerialExecutor.map <.SerialExecutor.map>`.
+        progressCall is called from the calling process whenever the
+        result of the next item (in order) is available.
+        """
+        if self.workers < 2:
+            return SerialExecutor.map(self,fn,items,context,progressCall)
+        pool=multiprocessing.Pool(self.workers,initializer=_initProcess,initargs=(context,))
+        try:
+            return _collect(pool.imap(_callInProcess,[(fn,item) for item in items]),progressCall)
+        finally:
+            pool.close()
+            pool.join()
+
+_executorKinds={
+    'serial': SerialExecutor,
+    'threads': ThreadExecutor,
+    'processes': ProcessExecutor,
+    }
+
+def getExecutor(executor=None,workers=None):
+    """
+    Return an executor.
+
+    :param executor: An executor object, one of 'serial', 'threads', 'processes' or None (use environment variable GATHODE_EXECUTOR).
+    :type executor: SerialExecutor or str
+    :param workers: Number of workers of a newly created executor, defaults to :py:func:`defaultNumWorkers`.
+    :type workers: int
+
+    :return: SerialExecutor -- (or subclass) the executor.
+    """
+    if executor is None:
+        executor=os.environ.get('GATHODE_EXECUTOR','serial')
+    if isinstance(executor,SerialExecutor):
+        return executor
+    if executor not in _executorKinds:
+        raise RuntimeError('unknown executor "'+str(executor)+'", should be one of '+', '.join(sorted(_executorKinds.keys())))
+    return _executorKinds[executor](workers)
+
+def _collect(results,progressCall):
+    """
+    Gather results of an iterator, calling progressCall for each.
+
+    For internal use only.
+    """
+    collected=[]
+    cnt=-1
+    for result in results:
+        cnt+=1
+        if progressCall is not None:
+            progressCall(cnt)
+        collected.append(result)
+    return collected
+
+# context of the tasks of a ProcessExecutor (set once in each process)
+_processContext=None
+
+def _initProcess(context):
+    """
+    Set the context of the tasks of this process.
+
+    For internal use only.
+    """
+    global _processContext
+    _processContext=context
+
+def _callInProcess(fnItem):
+    """
+    Call the function of a task with the context of this process.
+
+    For internal use only.
+    """
+    fn, item = fnItem
+    return fn(_processContext,item)
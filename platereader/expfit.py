@@ -0,0 +1,287 @@
+"""
+This module implements a vectorised sliding-window exponential fitter for GATHODE.
+
+Growth Analysis Tool for High-throughput Optical Density Experiments
+(GATHODE) exponential fits of many windows (and many wells) at once.
+"""
+
+# GATHODE  Growth Analysis Tool
+#          for High-throughput Optical Density Experiments
+#
+# Copyright (C) 2014 Nils Christian
+#
+# This file is part of GATHODE.
+#
+# GATHODE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# GATHODE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with GATHODE.  If not, see <http://www.gnu.org/licenses/>.
+
+import warnings
+import numpy
+import scipy.optimize
+
+from platereader.numpytools import slidingWindows
+from platereader.executor import warningsLock
+
+# tolerances as used by MINPACK's lmdif (the default of scipy.optimize.curve_fit)
+_xtol=1.49012e-8
+_ftol=1.49012e-8
+# time series are fitted in chunks so that temporary arrays stay below this number of elements
+_maxWindowElementsPerChunk=2**20
+
+def slidingWindowExpFit(time,od,slidingWindowSize,fitOd0=True,maxIterations=100):
+    """
+    Fit exponential functions to all sliding windows of one or many time series.
+
+    :param time: timepoints (shared by all time series)
+    :type time: numpy.array(float)
+    :param od: optical density, either one time series or a matrix with one time series per row
+    :type od: numpy.array(float)
+    :param slidingWindowSize: number of datapoints of each window
+    :type slidingWindowSize: int
+    :param fitOd0: whether the initial value is fitted (otherwise the first datapoint of the window is used)
+    :type fitOd0: bool
+    :param maxIterations: maximal number of Levenberg-Marquardt iterations
+    :type maxIterations: int
+
+    :return: numpy.array(float), numpy.array(float) -- mu, od0 (both of shape (..., len(time)-slidingWindowSize))
+
+    For the window starting at index i the function
+    :math:`OD(t) = OD_i e^{\mu (t - t_i)}` is fitted to the
+    datapoints [i,i+slidingWindowSize[. All windows are solved at
+    once: a log-linear least-squares fit serves as starting point,
+    followed by batched Levenberg-Marquardt iterations. This
+    converges to the same least-squares minimum as calling
+    scipy.optimize.curve_fit for each window, within the default
+    tolerances of MINPACK (_xtol, _ftol), i.e. results agree to
+    about 1e-7 relative, not bit for bit. Windows that do not
+    converge or that contain non-positive values are handed to
+    scipy.optimize.curve_fit, windows for which this fails as well
+    are set to NaN. If fitOd0 is False, od0 is NaN.
+    """
+    time=numpy.asarray(time,dtype=float)
+    od=numpy.asarray(od,dtype=float)
+    numWindows=time.shape[0]-slidingWindowSize
+    if numWindows < 0:
+        numWindows=0
+    if od.ndim == 2:
+        rowsPerChunk=max(1,_maxWindowElementsPerChunk//max(1,numWindows*slidingWindowSize))
+        if od.shape[0] > rowsPerChunk:
+            mu=numpy.empty([od.shape[0],numWindows])
+            od0=numpy.empty([od.shape[0],numWindows])
+            for start in range(0,od.shape[0],rowsPerChunk):
+                mu[start:start+rowsPerChunk], od0[start:start+rowsPerChunk] = slidingWindowExpFit(
+                    time,od[start:start+rowsPerChunk],slidingWindowSize,fitOd0=fitOd0,maxIterations=maxIterations)
+            return mu, od0
+    # x[i,j] = t[i+j]-t[i] (shared by all time series), y[...,i,j] = od[...,i+j]
+    tw=slidingWindows(time,slidingWindowSize,numWindows)
+    x=tw-tw[:,:1]
+    y=slidingWindows(od,slidingWindowSize,numWindows)
+    windowsShape=y.shape[:-1]
+    # one row per window (of all time series)
+    xflat=numpy.empty(y.shape)
+    xflat[...]=x
+    xflat=xflat.reshape(-1,slidingWindowSize)
+    yflat=y.reshape(-1,slidingWindowSize)
+
+    mu=numpy.empty([yflat.shape[0]])
+    mu.fill(numpy.nan)
+    od0=numpy.empty([yflat.shape[0]])
+    od0.fill(numpy.nan)
+    # windows with non-finite data cannot be fitted
+    finitewindows=numpy.isfinite(yflat).all(axis=-1)
+    # the least-squares problem of windows with non-positive data may have
+    # multiple minima, these windows are handed to curve_fit (as are the
+    # ones that do not converge) to get exactly the same local minimum
+    lmidcs=numpy.nonzero(numpy.logical_and(finitewindows,(yflat > 0).all(axis=-1)))[0]
+    if fitOd0:
+        lmod0, lmmu, converged = _levenbergMarquardtOd0Mu(xflat[lmidcs],yflat[lmidcs],maxIterations)
+        od0[lmidcs[converged]]=lmod0[converged]
+    else:
+        lmmu, converged = _levenbergMarquardtMu(xflat[lmidcs],yflat[lmidcs],maxIterations)
+    mu[lmidcs[converged]]=lmmu[converged]
+
+    curvefit=numpy.copy(finitewindows)
+    curvefit[lmidcs[converged]]=False
+    for idx in numpy.nonzero(curvefit)[0]:
+        mu[idx], od0[idx] = _curveFitWindow(xflat[idx],yflat[idx],fitOd0)
+
+    return mu.reshape(windowsShape), od0.reshape(windowsShape)
+
+def _curveFitWindow(x,y,fitOd0):
+    """
+    Fit a single window with scipy.optimize.curve_fit.
+
+    For internal use only.
+
+    :return: float, float -- mu, od0
+    """
+    try:
+        with warningsLock, warnings.catch_warnings():
+            # the covariance is not used, so it does not matter whether it could be estimated
+            warnings.simplefilter('ignore', scipy.optimize.OptimizeWarning)
+            if fitOd0:
+                popt, pcov = scipy.optimize.curve_fit(lambda tminti, *p: p[0] * numpy.exp(p[1]*(tminti)),
+                                                      xdata=x,ydata=y,p0=[y[0],1])
+                return popt[1], popt[0]
+            popt, pcov = scipy.optimize.curve_fit(lambda tminti, *p: y[0] * numpy.exp(p[0]*(tminti)),
+                                                  xdata=x,ydata=y,p0=[1])
+            return popt[0], numpy.nan
+    except RuntimeError:
+        return numpy.nan, numpy.nan
+
+def _logLinearStart(x,y,od0=None):
+    """
+    Starting values from a linear least-squares fit to log(y).
+
+    For internal use only.
+
+    :param x: time since start of window, one row per window
+    :param y: (positive) data, one row per window
+    :param od0: if given, the fit is constrained to pass through (0, log(od0))
+
+    :return: numpy.array(float), numpy.array(float) -- od0, mu
+    """
+    logy=numpy.log(y)
+    with numpy.errstate(divide='ignore',invalid='ignore'):
+        if od0 is None:
+            xcentered=x-x.mean(axis=-1)[:,None]
+            logymean=logy.mean(axis=-1)
+            mu=(xcentered*(logy-logymean[:,None])).sum(axis=-1)/(xcentered**2).sum(axis=-1)
+            od0=numpy.exp(logymean-mu*x.mean(axis=-1))
+        else:
+            mu=(x*(logy-numpy.log(od0)[:,None])).sum(axis=-1)/(x**2).sum(axis=-1)
+    return od0, mu
+
+def _levenbergMarquardtOd0Mu(x,y,maxIterations):
+    """
+    Batched Levenberg-Marquardt for y = a*exp(b*x) (parameters a, b).
+
+    For internal use only.
+
+    :param x: time since start of window, one row per window
+    :param y: (positive) data, one row per window
+
+    :return: numpy.array(float), numpy.array(float), numpy.array(bool) -- od0, mu, converged
+    """
+    a, b = _logLinearStart(x,y)
+    lam=numpy.empty(a.shape)
+    lam.fill(1e-3)
+    converged=numpy.zeros(a.shape,dtype=bool)
+    with numpy.errstate(over='ignore',invalid='ignore',divide='ignore'):
+        ssr=((y-a[:,None]*numpy.exp(b[:,None]*x))**2).sum(axis=-1)
+        # indices of windows that are still iterated
+        act=numpy.nonzero(numpy.logical_and(numpy.isfinite(a),numpy.isfinite(b)))[0]
+        for it in range(maxIterations):
+            if not act.shape[0]:
+                break
+            xa=x[act]
+            ya=y[act]
+            aa=a[act]
+            ba=b[act]
+            la=lam[act]
+            E=numpy.exp(ba[:,None]*xa)
+            r=ya-aa[:,None]*E
+            # normal equations with the Jacobian of the model [E, a*x*E]
+            J2=aa[:,None]*xa*E
+            A11=(E**2).sum(axis=-1)
+            A12=(E*J2).sum(axis=-1)
+            A22=(J2**2).sum(axis=-1)
+            g1=(E*r).sum(axis=-1)
+            g2=(J2*r).sum(axis=-1)
+            D11=A11*(1.+la)
+            D22=A22*(1.+la)
+            det=D11*D22-A12**2
+            da=(D22*g1-A12*g2)/det
+            db=(D11*g2-A12*g1)/det
+            na=aa+da
+            nb=ba+db
+            nssr=((ya-na[:,None]*numpy.exp(nb[:,None]*xa))**2).sum(axis=-1)
+
+            # degenerate problems are left to curve_fit
+            degenerate=numpy.logical_or(~numpy.isfinite(det),det <= 0)
+            accept=numpy.logical_and(~degenerate,nssr <= ssr[act])
+            smallstep=numpy.logical_and(numpy.abs(da) <= _xtol*(numpy.abs(na)+_xtol),
+                                        numpy.abs(db) <= _xtol*(numpy.abs(nb)+_xtol))
+            # a small reduction only indicates convergence for (nearly) Gauss-Newton steps
+            smallreduction=numpy.logical_and(ssr[act]-nssr <= _ftol*ssr[act],la < 1.)
+            done=numpy.logical_and(accept,numpy.logical_or(smallstep,smallreduction))
+            # no further reduction possible: this is the minimum (within floating point precision)
+            done|=numpy.logical_and(numpy.logical_and(~accept,~degenerate),la > 1e10)
+
+            acc=act[accept]
+            a[acc]=na[accept]
+            b[acc]=nb[accept]
+            ssr[acc]=nssr[accept]
+            lam[act]=numpy.where(accept,la*.1,la*10.)
+            converged[act[done]]=True
+            act=act[numpy.logical_and(~done,~degenerate)]
+
+    converged&=numpy.logical_and(numpy.isfinite(a),numpy.isfinite(b))
+    return a, b, converged
+
+def _levenbergMarquardtMu(x,y,maxIterations):
+    """
+    Batched Levenberg-Marquardt for y = y[0]*exp(b*x) (parameter b).
+
+    For internal use only.
+
+    :param x: time since start of window, one row per window
+    :param y: (positive) data, one row per window
+
+    :return: numpy.array(float), numpy.array(bool) -- mu, converged
+    """
+    y0=y[:,0]
+    dummy, b = _logLinearStart(x,y,od0=y0)
+    lam=numpy.empty(b.shape)
+    lam.fill(1e-3)
+    converged=numpy.zeros(b.shape,dtype=bool)
+    with numpy.errstate(over='ignore',invalid='ignore',divide='ignore'):
+        ssr=((y-y0[:,None]*numpy.exp(b[:,None]*x))**2).sum(axis=-1)
+        # indices of windows that are still iterated
+        act=numpy.nonzero(numpy.isfinite(b))[0]
+        for it in range(maxIterations):
+            if not act.shape[0]:
+                break
+            xa=x[act]
+            ya=y[act]
+            y0a=y0[act]
+            ba=b[act]
+            la=lam[act]
+            E=numpy.exp(ba[:,None]*xa)
+            r=ya-y0a[:,None]*E
+            J=y0a[:,None]*xa*E
+            A=(J**2).sum(axis=-1)
+            g=(J*r).sum(axis=-1)
+            db=g/(A*(1.+la))
+            nb=ba+db
+            nssr=((ya-y0a[:,None]*numpy.exp(nb[:,None]*xa))**2).sum(axis=-1)
+
+            # degenerate problems are left to curve_fit
+            degenerate=numpy.logical_or(~numpy.isfinite(A),A <= 0)
+            accept=numpy.logical_and(~degenerate,nssr <= ssr[act])
+            smallstep=numpy.abs(db) <= _xtol*(numpy.abs(nb)+_xtol)
+            # a small reduction only indicates convergence for (nearly) Gauss-Newton steps
+            smallreduction=numpy.logical_and(ssr[act]-nssr <= _ftol*ssr[act],la < 1.)
+            done=numpy.logical_and(accept,numpy.logical_or(smallstep,smallreduction))
+            # no further reduction possible: this is the minimum (within floating point precision)
+            done|=numpy.logical_and(numpy.logical_and(~accept,~degenerate),la > 1e10)
+
+            acc=act[accept]
+            b[acc]=nb[accept]
+            ssr[acc]=nssr[accept]
+            lam[act]=numpy.where(accept,la*.1,la*10.)
+            converged[act[done]]=True
+            act=act[numpy.logical_and(~done,~degenerate)]
+
+    converged&=numpy.isfinite(b)
+    return b, converged
@@ -0,0 +1,276 @@
+"""
+This module implements the :py:class:`PlateIndex` class, an SQLite database of growth parameters.
+
+Growth Analysis Tool for High-throughput Optical Density Experiments
+(GATHODE) plate index.
+
+The index holds one row per (non-background) well and replicate group
+of each indexed plate file, with the properties that can be exported
+to csv (see :py:meth:`Plate.availableColumnsForCsvExport
+<.Plate.availableColumnsForCsvExport>`). This allows to query e.g.
+the growth rates of a sample under a condition across many plates
+without opening the plate files.
+"""
+
+# GATHODE  Growth Analysis Tool
+#          for High-throughput Optical Density Experiments
+#
+# Copyright (C) 2014 Nils Christian
+#
+# This file is part of GATHODE.
+#
+# GATHODE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# GATHODE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with GATHODE.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import hashlib
+import json
+import sqlite3
+import numpy
+
+from platereader.plate import Plate
+from platereader.executor import getExecutor
+
+# columns holding text, all other property columns hold numbers
+_textColumns=['sample','condition','wellids']
+
+def _propertyColumns():
+    """
+    Return the properties stored for each replicate.
+
+    For internal use only.
+
+    :return: list(str) -- the properties of :py:meth:`Plate.availableColumnsForCsvExport <.Plate.availableColumnsForCsvExport>` and their variances.
+    """
+    fixedcolumns, morecolumns = Plate.availableColumnsForCsvExport()
+    columns=list(fixedcolumns)
+    for col in morecolumns:
+        columns.append(col)
+        if col not in _textColumns:
+            columns.append(col+'_var')
+    return columns
+
+class PlateIndex(object):
+    """
+    An SQLite database of the growth parameters of plate files.
+
+    Files are (re-)indexed with :py:meth:`update`, which skips files
+    that did not change since they were indexed. The growth parameters
+    are retrieved with :py:meth:`query`.
+    """
+
+    def __init__(self,filename):
+        """
+        Constructor.
+
+        :param filename: Name of the database file (created if it does not exist), ':memory:' for a temporary database.
+        :type filename: str
+        """
+        self.columns=_propertyColumns()
+        self._connection=sqlite3.connect(filename)
+        coldefs=[]
+        for col in self.columns:
+            coldefs.append('"'+col+'" '+('TEXT' if col in _textColumns else 'REAL'))
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS files ('
+                                     +'id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime REAL, size INTEGER,'
+                                     +' digest TEXT, plateId TEXT, fileformat TEXT)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS replicates ('
+                                     +'fileId INTEGER REFERENCES files(id),'
+                                     +' isReplicateGroup INTEGER, replicateIndex INTEGER, parameterHash TEXT, '
+                                     +', '.join(coldefs)+')')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS replicatesSampleCondition ON replicates (sample, condition)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS replicatesFileId ON replicates (fileId)')
+
+    def close(self):
+        """
+        Close the database.
+        """
+        self._connection.close()
+
+    def update(self,filenames,executor=None,progressCall=None):
+        """
+        Index plate files.
+
+        :param filenames: Names of the files (gat files or files exported by the plate reader).
+        :type filenames: list(str)
+        :param executor: Executor loading the plates and calculating the growth parameters (see :py:mod:`platereader.executor`).
+        :type executor: SerialExecutor or str
+        :param progressCall: Function that will be called for each file that is (re-)indexed.
+        :type progressCall: @fun(int)
+
+        :return: list(str) -- names of the files that were (re-)indexed.
+
+        A file is skipped if its modification time and size did not
+        change since it was indexed. Otherwise the digest of its
+        content is compared and only files with a different content
+        are loaded. The rows of all files are inserted in a single
+        transaction.
+        """
+        known={}
+        for fileId, path, mtime, size, digest in self._connection.execute('SELECT id, path, mtime, size, digest FROM files'):
+            known[path]=(fileId,mtime,size,digest)
+
+        changed=[]
+        touched=[]
+        for filename in filenames:
+            path=os.path.abspath(filename)
+            stat=os.stat(path)
+            if path in known and known[path][1] == stat.st_mtime and known[path][2] == stat.st_size:
+                continue
+            digest=_fileDigest(path)
+            if path in known and known[path][3] == digest:
+                touched.append((stat.st_mtime,stat.st_size,known[path][0]))
+                continue
+            changed.append((path,stat.st_mtime,stat.st_size,digest))
+
+        results=getExecutor(executor).map(_indexFileWorker,[c[0] for c in changed],
+                                          context=self.columns,progressCall=progressCall)
+
+        placeholders=', '.join(['?']*(4+len(self.columns)))
+        insertReplicates=('INSERT INTO replicates (fileId, isReplicateGroup, replicateIndex, parameterHash, '
+                          +', '.join(['"'+col+'"' for col in self.columns])+') VALUES ('+placeholders+')')
+        with self._connection:
+            self._connection.executemany('UPDATE files SET mtime=?, size=? WHERE id=?',touched)
+            for (path, mtime, size, digest), (plateId, fileformat, rows) in zip(changed,results):
+                if path in known:
+                    self._connection.execute('DELETE FROM replicates WHERE fileId=?',(known[path][0],))
+                    self._connection.execute('DELETE FROM files WHERE id=?',(known[path][0],))
+                cursor=self._connection.execute('INSERT INTO files (path, mtime, size, digest, plateId, fileformat)'
+                                                +' VALUES (?, ?, ?, ?, ?, ?)',
+                                                (path,mtime,size,digest,plateId,fileformat))
+                fileId=cursor.lastrowid
+                self._connection.executemany(insertReplicates,[(fileId,)+tuple(row) for row in rows])
+
+        return [c[0] for c in changed]
+
+    def removeMissing(self):
+        """
+        Remove files from the index that do not exist anymore.
+
+        :return: list(str) -- names of the removed files.
+        """
+        missing=[]
+        for fileId, path in self._connection.execute('SELECT id, path FROM files').fetchall():
+            if not os.path.exists(path):
+                missing.append((fileId,path))
+        with self._connection:
+            for fileId, path in missing:
+                self._connection.execute('DELETE FROM replicates WHERE fileId=?',(fileId,))
+                self._connection.execute('DELETE FROM files WHERE id=?',(fileId,))
+        return [path for fileId, path in missing]
+
+    def query(self,columns,sample=None,condition=None,plateId=None,path=None,replicateGroups=True):
+        """
+        Return properties of the indexed replicates.
+
+        :param columns: Properties (see :py:attr:`columns`), as well as 'path', 'plateId', 'replicateIndex' and 'parameterHash'.
+        :type columns: list(str)
+        :param sample: Only replicates of this sample.
+        :type sample: str
+        :param condition: Only replicates grown under this condition.
+        :type condition: str
+        :param plateId: Only replicates of plates with this id.
+        :type plateId: str
+        :param path: Only replicates of files matching this (SQL LIKE) pattern, e.g. '%/2025/%'.
+        :type path: str
+        :param replicateGroups: Return replicate groups (True), single wells (False) or both (None).
+        :type replicateGroups: bool
+
+        :return: dict(str -> numpy.array) -- the values of each column; float arrays (nan for missing values) for numeric properties, object arrays otherwise.
+        """
+        fileColumns=['path','plateId']
+        otherColumns=['replicateIndex','parameterHash']
+        selected=[]
+        for col in columns:
+            if col in fileColumns:
+                selected.append('files.'+col)
+            elif col in self.columns or col in otherColumns:
+                selected.append('replicates."'+col+'"')
+            else:
+                raise RuntimeError('unknown column '+col)
+        conditions=[]
+        values=[]
+        for col, val in (('replicates.sample',sample),('replicates.condition',condition),('files.plateId',plateId)):
+            if val is not None:
+                conditions.append(col+'=?')
+                values.append(val)
+        if path is not None:
+            conditions.append('files.path LIKE ?')
+            values.append(path)
+        if replicateGroups is not None:
+            conditions.append('replicates.isReplicateGroup=?')
+            values.append(1 if replicateGroups else 0)
+        sql=('SELECT '+', '.join(selected)+' FROM replicates JOIN files ON replicates.fileId=files.id'
+             +(' WHERE '+' AND '.join(conditions) if len(conditions) else '')
+             +' ORDER BY files.path, replicates.isReplicateGroup, replicates.replicateIndex')
+        rows=self._connection.execute(sql,values).fetchall()
+
+        result={}
+        idx=0
+        for col in columns:
+            if col in fileColumns or col in _textColumns or col == 'parameterHash':
+                arr=numpy.empty(len(rows),dtype=object)
+                arr[:]=[row[idx] for row in rows]
+            else:
+                arr=numpy.array([row[idx] if row[idx] is not None else numpy.nan for row in rows],dtype=float)
+            result[col]=arr
+            idx+=1
+        return result
+
+def _fileDigest(filename):
+    """
+    Return the digest of the content of a file.
+
+    For internal use only.
+    """
+    digest=hashlib.sha1()
+    with open(filename,'rb') as rfile:
+        for chunk in iter(lambda: rfile.read(1024*1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _parameterHash(tc):
+    """
+    Return a digest of the parameters of a replicate.
+
+    For internal use only.
+    """
+    pars={}
+    for par in tc.parentPlate._inheritableParameters:
+        pars[par]=tc.getParameter(par)
+    return hashlib.sha1(json.dumps(pars,sort_keys=True).encode('utf-8')).hexdigest()
+
+def _indexFileWorker(columns,filename):
+    """
+    Load a plate and return the rows of its replicates for :py:meth:`PlateIndex.update <.PlateIndex.update>`.
+
+    For internal use only.
+    """
+    plate=Plate(filename=filename)
+    plate.computeAll(workers=1)
+    rows=[]
+    backgroundGroups=plate.backgroundReplicateGroupIndices()
+    backgroundWells=plate.backgroundWellIndices()
+    for isGroup, replicates, background in ((1,plate.replicateGroups,backgroundGroups),(0,plate.wells,backgroundWells)):
+        idx=-1
+        for tc in replicates:
+            idx+=1
+            if idx in background:
+                continue
+            values=[]
+            for col, val in zip(columns,plate._growthParametersCsvRow(tc,columns)):
+                # (numpy scalars cannot be stored by sqlite)
+                values.append(float(val) if val is not None and col not in _textColumns else val)
+            rows.append([isGroup,idx,_parameterHash(tc)]+values)
+    return plate.plateId, plate.readfileformat, rows
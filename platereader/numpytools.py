@@ -25,51 +25,87 @@ This module implements some helper function for numpy.
 import math
 import numpy
 
-def maskedArrayToMeanVar(marr,idcs=None,ddof=0,axis=None):
-    """"
-    Calls mean and var removing nans.
+def nanMeanVar(arr,idcs=None,ddof=0,axis=None,out=None):
+    """
+    Mean and variance of the values that are not nan (or not masked), without creating masked arrays.
 
-    Makes sure a None is returned if '--' would be returned by
-    masked_array.
+    :param arr: the data
+    :type arr: numpy.array(float)
+    :param idcs: mask of the values that are left out (broadcastable to arr), defaults to the nans of arr
+    :type idcs: numpy.array(bool)
+    :param ddof: delta degrees of freedom of the variance
+    :type ddof: int
+    :param axis: axis along which mean and variance are calculated (None: all values)
+    :type axis: int
+    :param out: arrays (mean, var) the results are written to if axis is not None
+    :type out: tuple(numpy.array(float), numpy.array(float))
+
+    :return: float, float or numpy.array(float), numpy.array(float) -- mean, var
+
+    Mean and variance are None if all values are left out. For
+    axis=None they are None if undefined, otherwise undefined
+    elements (all values left out, no more than ddof values) are nan.
+    Values that are not left out by idcs but are nan propagate.
     """
+    arr=numpy.asarray(arr)
     if idcs is None:
-        idcs=numpy.isnan(marr)
-    if numpy.all(idcs):
+        valid=~numpy.isnan(arr)
+    else:
+        # (broadcast to the shape of arr)
+        valid=numpy.logical_not(idcs,out=numpy.empty(arr.shape,dtype=bool))
+    n=numpy.add.reduce(valid,axis=axis,dtype=int)
+    if not n.any():
         return None, None
-    themean=numpy.ma.masked_array(marr,idcs).mean(axis=axis)
-    thevar=numpy.ma.masked_array(marr,idcs).var(ddof=ddof,axis=axis)
+    themean, thevar = out if out is not None and axis is not None else (None, None)
+    with numpy.errstate(divide='ignore',invalid='ignore'):
+        # (always summed in double precision)
+        themean=numpy.add.reduce(arr,axis=axis,dtype=float,out=themean,where=valid)
+        themean=numpy.divide(themean,n,out=themean if axis is not None else None)
+        if axis is None:
+            deviations=numpy.subtract(arr,themean,dtype=float)
+        else:
+            axis=axis%arr.ndim
+            deviations=numpy.subtract(arr,themean.reshape(arr.shape[:axis]+(1,)+arr.shape[axis+1:]),dtype=float)
+        numpy.multiply(deviations,deviations,out=deviations)
+        thevar=numpy.add.reduce(deviations,axis=axis,out=thevar,where=valid)
+        thevar=numpy.divide(thevar,n-ddof,out=thevar if axis is not None else None)
 
-    # ensure that '--' is replaced with nan/None
     if axis is not None:
-        themean[numpy.ma.getmaskarray(themean)]=None
-        thevar[numpy.ma.getmaskarray(thevar)]=None            
+        thevar[n <= ddof]=numpy.nan
     else:
-        if type(themean) == numpy.ma.core.MaskedConstant:
+        if math.isnan(themean):
             themean=None
-        if type(thevar) == numpy.ma.core.MaskedConstant:
-            thevar=None
-        if themean is not None and math.isnan(themean):
-            themean=None
-        if thevar is not None and math.isnan(thevar):
+        if n <= ddof or math.isnan(thevar):
             thevar=None
 
     return themean, thevar
 
-def notNanAndGreaterEqual(vec,val):
-    if numpy.any(numpy.isnan(vec)):
-        # FIXME we make a copy here!
-        veccopy = numpy.copy(vec)
-        veccopy[numpy.isnan(vec)] = val - 42.
-        return veccopy >= val
-    return vec >= val
-
-def notNanAndLess(vec,val):
-    if numpy.any(numpy.isnan(vec)):
-        # FIXME we make a copy here!
-        veccopy = numpy.copy(vec)
-        veccopy[numpy.isnan(vec)] = val + 42.
-        return veccopy < val
-    return vec < val
+def maskedArrayToMeanVar(marr,idcs=None,ddof=0,axis=None):
+    """"
+    Calls mean and var removing nans.
+
+    Makes sure a None is returned if '--' would be returned by
+    masked_array.
+
+    Same as :py:func:`nanMeanVar`, kept for backwards compatibility.
+    """
+    return nanMeanVar(marr,idcs=idcs,ddof=ddof,axis=axis)
+
+def notNanAndGreaterEqual(vec,val,out=None):
+    """
+    Return where vec is not nan and greater or equal to val (without copying vec).
+    """
+    # comparisons with nan are False
+    with numpy.errstate(invalid='ignore'):
+        return numpy.greater_equal(vec,val,out=out)
+
+def notNanAndLess(vec,val,out=None):
+    """
+    Return where vec is not nan and less than val (without copying vec).
+    """
+    # comparisons with nan are False
+    with numpy.errstate(invalid='ignore'):
+        return numpy.less(vec,val,out=out)
 
 def nonNanSqrt(vec):
     s = numpy.empty(vec.shape)
@@ -87,3 +123,102 @@ def nonNanNonZeroDivide(vecnom,vecden):
     s[idcsok] = numpy.divide(vecnom[idcsok],vecden[idcsok])
     s[~idcsok] = numpy.nan
     return s
+
+def slidingWindows(vec,windowSize,numWindows=None):
+    """
+    Return a read-only view of all windows of length windowSize along the last axis.
+
+    :param vec: array of shape (..., n)
+    :type vec: numpy.array
+    :param windowSize: number of elements per window
+    :type windowSize: int
+    :param numWindows: number of windows (defaults to n-windowSize+1)
+    :type numWindows: int
+
+    :return: numpy.array -- view of shape (..., numWindows, windowSize), no data is copied.
+    """
+    vec=numpy.asarray(vec)
+    if numWindows is None:
+        numWindows=vec.shape[-1]-windowSize+1
+    if numWindows < 0 or numWindows+windowSize-1 > vec.shape[-1]:
+        raise ValueError('cannot create '+str(numWindows)+' windows of size '+str(windowSize)
+                         +' from an array of length '+str(vec.shape[-1]))
+    shape=vec.shape[:-1]+(numWindows,windowSize)
+    strides=vec.strides[:-1]+(vec.strides[-1],vec.strides[-1])
+    windows=numpy.lib.stride_tricks.as_strided(vec,shape=shape,strides=strides)
+    windows.flags.writeable=False
+    return windows
+
+def rollingSum(vec,windowSize):
+    """
+    Return the sums of all windows of length windowSize (computed via the cumulative sum).
+
+    :return: numpy.array -- array of length len(vec)-windowSize+1
+    """
+    csum=numpy.empty([vec.shape[0]+1])
+    csum[0]=0.
+    numpy.cumsum(vec,out=csum[1:])
+    return csum[windowSize:]-csum[:-windowSize]
+
+def rollingMeanVar(vec,windowSize,ddof=0):
+    """
+    Mean and variance of all windows of length windowSize in O(n).
+
+    :param vec: the data
+    :type vec: numpy.array(float)
+    :param windowSize: number of datapoints per window
+    :type windowSize: int
+    :param ddof: delta degrees of freedom of the variance
+    :type ddof: int
+
+    :return: numpy.array(float), numpy.array(float) -- mean, var (each of length len(vec)-windowSize+1)
+    """
+    # (always summed in double precision)
+    vec=numpy.asarray(vec,dtype=float)
+    # shifting the data reduces cancellation in the sums of squares
+    shift=vec.mean() if vec.shape[0] else 0.
+    svec=vec-shift
+    s1=rollingSum(svec,windowSize)
+    s2=rollingSum(svec**2,windowSize)
+    mean=s1/windowSize
+    var=numpy.maximum(s2-s1*mean,0.)/(windowSize-ddof)
+    return mean+shift, var
+
+def rollingLinregress(x,y,windowSize):
+    """
+    Linear regression of all windows of length windowSize in O(n).
+
+    :param x: the independent variable
+    :type x: numpy.array(float)
+    :param y: the dependent variable
+    :type y: numpy.array(float)
+    :param windowSize: number of datapoints per window
+    :type windowSize: int
+
+    :return: numpy.array(float), numpy.array(float), numpy.array(float) -- slope, intercept, standard error of slope
+
+    For each window the results are the same as the ones of
+    scipy.stats.linregress (within floating point precision).
+    """
+    # (always summed in double precision)
+    x=numpy.asarray(x,dtype=float)
+    y=numpy.asarray(y,dtype=float)
+    # shifting the data reduces cancellation in the sums of squares
+    xshift=x.mean() if x.shape[0] else 0.
+    yshift=y.mean() if y.shape[0] else 0.
+    sx=x-xshift
+    sy=y-yshift
+    sumx=rollingSum(sx,windowSize)
+    sumy=rollingSum(sy,windowSize)
+    xmean=sumx/windowSize
+    ymean=sumy/windowSize
+    ssxm=rollingSum(sx*sx,windowSize)-sumx*xmean
+    ssym=numpy.maximum(rollingSum(sy*sy,windowSize)-sumy*ymean,0.)
+    ssxym=rollingSum(sx*sy,windowSize)-sumx*ymean
+    with numpy.errstate(divide='ignore',invalid='ignore'):
+        slope=ssxym/ssxm
+        # (1-r^2)*ssym, with r clipped to [-1,1] as done by linregress
+        residual=numpy.maximum(ssym-ssxym*slope,0.)
+        slopeStdErr=numpy.sqrt(residual/ssxm/(windowSize-2))
+    intercept=ymean+yshift-slope*(xmean+xshift)
+    return slope, intercept, slopeStdErr
@@ -52,6 +52,8 @@ def odCommandlineInterfaceArgv(argv=['odcli']):
                         help='smoothing factor passed to UnivariateSpline')
     parser.add_argument('--k', '-k', action='store', type=int, default=5,
                         help='degree of smoothing spline')
+    parser.add_argument('--smoother', action='store', choices=Plate.smoothers, default='univariatespline',
+                        help='smooth each well with UnivariateSpline or all wells at once')
     parser.add_argument('--hdlin', action='store', type=float, default=1.,
                         help='high density correction linear term')
     parser.add_argument('--hdquad', action='store', type=float, default=0.,
@@ -70,37 +72,50 @@ def odCommandlineInterfaceArgv(argv=['odcli']):
     parser.add_argument('--onlyAveraged', action='store_true', default=True,
                         help='show only the averaged replicates, not each well individually')
     parser.add_argument('--gat', action='store', help='save as gat-file')
+    parser.add_argument('--gatformat', action='store', choices=['1','2'], default='1',
+                        help='format version of the saved gat-file (2 is binary and faster to load, but cannot be opened by earlier versions)')
+    parser.add_argument('--jobs', '-j', action='store', type=int, default=1,
+                        help='number of processes used to calculate the growth parameters (0: one per CPU)')
+    parser.add_argument('--resultcache', action='store_true', default=False,
+                        help='use and update the results saved beside the gat-file (file.gat.cache)')
     args = parser.parse_args(argv)
 
     if args.version:
         print(executablename+' '+__version__)
         return 0
     if args.infile is not None:
-        plate=Plate(filename=args.infile)
+        plate=Plate(filename=args.infile,resultCache=args.resultcache)
     else:
         parser.print_help()
         print('\ninput file missing')
         return -1
+    plate.setSmoother(args.smoother)
     if plate.readfileformat != 'gat':
-        plate.setHighDensityCorrectionLinear(args.hdlin)
-        plate.setHighDensityCorrectionQuadratic(args.hdquad)
-        plate.setHighDensityCorrectionCubic(args.hdcub)
-        plate.setLogOdCutoff(args.logodcutoff)
-        plate.setSmoothingS(args.s)
-        plate.setSmoothingK(args.k)
-        plate.setMaxGrowthLowerTimeCutoff(args.maxgrowthlowertimecutoff)
-        plate.setMaxGrowthUpperTimeCutoff(args.maxgrowthuppertimecutoff)
-        plate.setLagAtLogOdEquals(args.lagatlogodequals)
+        with plate.batchUpdate():
+            plate.setHighDensityCorrectionLinear(args.hdlin)
+            plate.setHighDensityCorrectionQuadratic(args.hdquad)
+            plate.setHighDensityCorrectionCubic(args.hdcub)
+            plate.setLogOdCutoff(args.logodcutoff)
+            plate.setSmoothingS(args.s)
+            plate.setSmoothingK(args.k)
+            plate.setMaxGrowthLowerTimeCutoff(args.maxgrowthlowertimecutoff)
+            plate.setMaxGrowthUpperTimeCutoff(args.maxgrowthuppertimecutoff)
+            plate.setLagAtLogOdEquals(args.lagatlogodequals)
+
+    if args.jobs != 1 and (args.csvout is not None or (args.gat is None and args.pdf is not None)):
+        plate.computeAll(workers=args.jobs if args.jobs > 0 else None)
 
     if args.csvout is not None:
         plate.growthParametersToCsv(args.csvout)
     elif args.gat is not None:
-        plate.save(args.gat)
+        plate.save(args.gat,saveResultCache=args.resultcache,formatversion=args.gatformat)
     elif args.pdf is not None:
         plotFullOdPlate(plate,pdfout=args.pdf,creator=commandline,showReplicateGroups=args.onlyAveraged)
     else:
         print("don't know what to do")
         return -1
+    if args.resultcache and plate.readfileformat == 'gat' and args.gat is None:
+        plate.saveResultCache(args.infile)
     return 0
 
 def odCommandlineInterface():
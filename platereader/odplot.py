@@ -38,6 +38,7 @@ import matplotlib.legend_handler
 from platereader.statusmessage import StatusMessage, Severity
 
 from platereader.numpytools import notNanAndGreaterEqual, notNanAndLess, nonNanSqrt, nonNanNonZeroDivide
+from platereader.executor import getExecutor
 
 def twentysixColours():
     """
@@ -1017,7 +1018,8 @@ def plotFullOdPlate(plate,pdfout,creator=None,
                     showDerivativeLinear=True, showSmoothedDerivativeLinear=True,
                     showExpFitsOd0Mu=True,showExpFitsMu=False,
                     showGrowthyield=True,
-                    progressCall=None):
+                    progressCall=None,
+                    executor=None):
     """
     Create a multi-page pdf with many properties in plots.
 
@@ -1025,6 +1027,8 @@ def plotFullOdPlate(plate,pdfout,creator=None,
     :type pdfout: string
     :param progressCall: Function that will be called on each iteration.
     :type progressCall: @fun(int)
+    :param executor: Executor calculating the growth parameters before plotting (see :py:mod:`platereader.executor`).
+    :type executor: SerialExecutor or str
 
     FIXME enhance documentation of parameters.
     """
@@ -1044,6 +1048,16 @@ def plotFullOdPlate(plate,pdfout,creator=None,
                 listOfReplicates=plate.wells
             else:
                 listOfReplicates=plate.nonBackgroundWells()
+
+        # fit all wells at once
+        if showMaxGrowthrate or showExpFitsOd0Mu:
+            plate.computeExpFits()
+        if showExpFitsMu:
+            plate.computeExpFits(fitOd0=False)
+        executor=getExecutor(executor)
+        if executor.parallel:
+            # plotting itself is serial, but the growth parameters can be calculated beforehand
+            plate.computeAll(executor=executor)
     
         plotReplicatesToPdfPages(plate,pdfp,
                                  listOfReplicates=listOfReplicates,
@@ -55,8 +55,8 @@ def parse(filename):
 
     :param odcsvfilename: filename of the Bioscreen export
 
-    :return: numpy.array(float), list( numpy.array(float) ), list(str), str, numpy.array(float)
-     -- time (in seconds), optical density readouts, sample ids, plate id, temperature
+    :return: numpy.array(float), numpy.array(float), list(str), str, numpy.array(float)
+     -- time (in seconds), optical density readouts (one row per well), sample ids, plate id, temperature
 
     :param seperator: split well ids on this seperator to distinguish between sample id and condition
     :type seperator: string
@@ -101,10 +101,8 @@ def parse(filename):
     # the time as numpy array
     time=numpy.array(time,dtype=float)
 
-    # create a python list of numpy arrays of raw data
-    rawOd=[]
-    for l in rawOdList:
-        rawOd.append(numpy.array(l,dtype=float))
+    # create a (wells x timepoints) matrix of raw data
+    rawOd=numpy.array(rawOdList,dtype=float)
 
     # add dummy conditions
     conditions=[]
@@ -80,8 +80,8 @@ def parse(odcsvfilename,seperator='_'):
 
     :param odcsvfilename: filename of the Tecan export
 
-    :return: numpy.array(float), list( numpy.array(float) ), list(str), str, numpy.array(float), list(str)
-     -- time (in seconds), optical density readouts, sample ids, plate id, temperature, wellids
+    :return: numpy.array(float), numpy.array(float), list(str), str, numpy.array(float), list(str)
+     -- time (in seconds), optical density readouts (one row per well), sample ids, plate id, temperature, wellids
 
     :param seperator: split well ids on this seperator to distinguish between sample id and condition
     :type seperator: string
@@ -170,10 +170,8 @@ def _parseTecanCsvExportHelper(odcsvfilename,seperator='_',encoding="utf-8"):
             newtemp.append(re.sub("\s* \xb0C$", "", t))
         temperature=numpy.array(newtemp,dtype=float)
 
-    # create a python list of numpy arrays of raw data
-    rawOd=[]
-    for l in rawOdList:
-        rawOd.append(numpy.array(l,dtype=float))
+    # create a (wells x timepoints) matrix of raw data
+    rawOd=numpy.array(rawOdList,dtype=float)
 
     # 
     sampleIds=[]
@@ -27,12 +27,20 @@ Growth Analysis Tool for High-throughput Optical Density Experiments
 
 import os.path
 import math
+import collections
+import contextlib
 import numpy
 import json
-import bz2
 
 import platereader
 from platereader.replicate import Replicate
+from platereader.expfit import slidingWindowExpFit
+from platereader.smoothing import SmoothingSplineBasis
+from platereader.executor import getExecutor, ThreadExecutor, ProcessExecutor
+from platereader.resultcache import resultCacheFilename, plateDigest
+from platereader.serialisation import isBinary, packBinary, unpackBinary, mapBinary, binaryMagic
+from platereader.serialisation import readCompressed, writeCompressed, readBinaryHeader
+from platereader.resultcache import writeResultCache, readResultCacheHeader, readResultCacheEntries
 from platereader.statusmessage import StatusMessage, Severity
 from platereader.csvunicode import CsvFileUnicodeWriter, CsvFileUnicodeReader
 from platereader.parser import tecan, bioscreen
@@ -54,7 +62,8 @@ class Plate(object):
 
     def __init__(self,filename=None,fileformat=None,
                  time=None,rawOds=None,
-                 sampleIds=None,conditions=None,wellids=None,plateId=None):
+                 sampleIds=None,conditions=None,wellids=None,plateId=None,
+                 resultCache=False,precision=None):
         """
         Constructor.
 
@@ -70,8 +79,8 @@ class Plate(object):
         :param time: array of timepoints when optical density was measured
         :type time: numpy.array(float)
 
-        :param rawOds: list of optical density arrays
-        :type rawOds: list( numpy.array(float) )
+        :param rawOds: optical densities, one row per well
+        :type rawOds: numpy.array(float) or list( numpy.array(float) )
 
         :param sampleIds: list of sample names corresponding to the array of optical densities
         :type sampleIds: list(str)
@@ -81,9 +90,32 @@ class Plate(object):
 
         :param plateId: name of this plate
         :type plateId: str
+
+        :param resultCache: use results saved beside a gat file (see :py:meth:`saveResultCache <.Plate.saveResultCache>`)
+        :type resultCache: bool
+
+        :param precision: floating point precision of optical densities and results, one of :py:attr:`precisions` (see :py:meth:`setPrecision <.Plate.setPrecision>`), defaults to the precision of a gat file and to 'float64' otherwise
+        :type precision: str
         """
+        if precision is not None and precision not in Plate.precisions:
+            raise RuntimeError('unknown precision "'+str(precision)+'", should be one of '+', '.join(Plate.precisions))
         self.plateId=None
         self._rawOd=None
+        self._precision=precision
+        self._smoother='univariatespline'
+        self._smoothingSplineBasis=None
+        self._memoised={}
+        self._previousMemoised=collections.OrderedDict()
+        self._previousMemoisedSignatures={}
+        self._previousMemoisedNbytes=0
+        self._previousMemoisedBudget=Plate._defaultPreviousMemoisedBudget
+        self._pendingResultCache=None
+        self._resultCacheMemoised={} # replicate -> key -> signature -> result loaded from the result cache
+        self._batchUpdateDepth=0
+        self._batchUpdatePars=set()
+        self._parameterGeneration=0 # incremented whenever a parameter of the plate or a replicate changes
+        self._resolvedParameters=None
+        self._resolvedParametersGeneration=None
         self.wells=None
         self.time=None
         self.temperature=None
@@ -124,6 +156,8 @@ class Plate(object):
                     fileformat=scorefileformat[0]['fileformat']
             if fileformat == 'gat':
                 self._load(filename)
+                if resultCache:
+                    self._openResultCache(resultCacheFilename(filename))
             elif fileformat in Plate._parser2module:
                 time, rawOd, sampleIds, conditions, plateId, temperature, wellids=Plate._parser2module[fileformat].parse(filename)
                 self._initFromArrays(time,rawOd,sampleIds,conditions,plateId=plateId,temperature=temperature,wellids=wellids)
@@ -137,13 +171,20 @@ class Plate(object):
         self.modified=False
 
     def _clearReplicateGroups(self):
-        if hasattr(self,'replicateGroups'):
-            for tc in self.replicateGroups:
+        if hasattr(self,'replicateGroups') and self.replicateGroups is not None:
+            # (replicate groups that were not created yet are not referenced anywhere)
+            replicateGroups=self.replicateGroups
+            if isinstance(replicateGroups,_LazyReplicates):
+                replicateGroups=replicateGroups.created()
+            for tc in replicateGroups:
                 # NOTE invalidating here so code holding references to these fails
                 tc._invalidate()
 
         self.replicateGroups=None
+        self._parameterGeneration+=1
         self._backgroundGroupIndices=None
+        self._backgroundDependents=None # background replicate group index -> indices of wells and replicate groups it is the background of
+        self._replicateGroupIndexOfWellIndices=None # tuple of well indices -> index of replicate group
         self._sampleConditionToReplicateGroupIdcs=None # an associative array mapping replicate groups by sample ID to a list of Replicate object indices
         self._conditionToReplicateGroupIdx=None  # an associative array mapping condition to a list of replicate group object indices
 
@@ -154,21 +195,71 @@ class Plate(object):
         self._sampleConditionToWellIdcs=None # an associative array mapping wells (sample IDs) to a list of Replicate object indices
 
     def _load(self,filename):
-        with bz2.BZ2File(filename, 'r') as rfile:
-            pickled=rfile.read().decode("utf-8")
+        with open(filename,'rb') as rfile:
+            magic=rfile.read(len(binaryMagic))
+        if magic == binaryMagic:
+            # uncompressed: the raw optical densities are memory-mapped
+            try:
+                unpickled = mapBinary(filename)
+            except ValueError as err:
+                raise Plate.UnknownFileFormat(filename,detailedError=str(err))
+            return self._deserialise(unpickled,filename)
+
+        pickled=readCompressed(filename)
 
         try:
-            unpickled = json.loads(pickled)
+            if isBinary(pickled):
+                unpickled = unpackBinary(pickled)
+            else:
+                unpickled = json.loads(pickled.decode("utf-8"))
         except ValueError as err:
             raise Plate.UnknownFileFormat(filename,detailedError=str(err))
         return self._deserialise(unpickled,filename)
 
+    @staticmethod
+    def readHeader(filename):
+        """
+        Read metadata and parameters of a plate file without loading the optical densities.
+
+        :param filename: Name of the plate (gat) file.
+        :type filename: str
+
+        :return: dict -- the serialisation of the plate without time, temperature and raw optical densities.
+
+        The dictionary holds the keys 'plateId', 'timeunit', the
+        plate's parameters, and 'wells' and 'replicateGroup' with a
+        dictionary for each well and replicate group ('sampleId',
+        'condition', 'wellIds', 'wellIndices', 'activeWellIndices',
+        'backgroundIndex' and the replicate's parameters). No
+        Replicate objects are created.
+
+        For files of format version 2 only the beginning of the file
+        is read and decompressed. Files of format version 1 have to be
+        read completely.
+        """
+        if not os.path.exists(filename):
+            raise IOError("No such file or directory: '"+filename+"'")
+        try:
+            header=readBinaryHeader(filename)
+            if header is None:
+                header=json.loads(readCompressed(filename).decode("utf-8"))
+                for key in ['time','temperature','rawOd']:
+                    header.pop(key,None)
+        except ValueError as err:
+            raise Plate.UnknownFileFormat(filename,detailedError=str(err))
+        if 'format' not in header:
+            raise Plate.UnknownFileFormat(filename,detailedError='no "format" keyword found in file')
+        serFormatVersion=header['formatversion'] if 'formatversion' in header else 'undefined'
+        if header['format'] != 'opticaldensityplate' or serFormatVersion not in ['1','2']:
+            raise Plate.UnknownFileFormat(filename,serFormat=header['format'],serFormatVersion=serFormatVersion)
+        return header
+
     def _deserialise(self,unpickled,filename):
         if 'format' not in unpickled:
             raise Plate.UnknownFileFormat(filename,detailedError='no "format" keyword found in file')
 
         serFormatVersion=unpickled['formatversion'] if 'formatversion' in unpickled else 'undefined'
-        if unpickled['format'] != 'opticaldensityplate' or serFormatVersion != '1':
+        if unpickled['format'] != 'opticaldensityplate' or serFormatVersion not in ['1','2']:
             raise Plate.UnknownFileFormat(filename,serFormat=unpickled['format'],serFormatVersion=serFormatVersion)
 
         parkeys=[
@@ -193,47 +284,103 @@ class Plate(object):
             self._inheritableParameters[par]=None
 
         self.plateId=unpickled['plateId']
-        self.time=numpy.array(unpickled['time'],dtype=float)
+        # (for format version 2 these are arrays already and are not copied)
+        self.time=numpy.asarray(unpickled['time'],dtype=float)
         self.timeunit=unpickled['timeunit']
         # defaut parameters, some of which can be overridden by the individual replicates
         for par in parkeys:
             self._inheritableParameters[par]=unpickled[par] 
+        self._parameterGeneration+=1
 
         if 'temperature' in unpickled:
-            self.temperature=numpy.array(unpickled['temperature'],dtype=float)
-        self._rawOd=[]
-        for lst in unpickled['rawOd']:
-            self._rawOd.append(numpy.array(lst,dtype=float))
-        self.wells=[]
-        for tcup in unpickled['wells']:
-            self.wells.append(Replicate(_unpickled=tcup,parentPlate=self,_serialiseFormat=unpickled['format']))
-        self.replicateGroups=[]
+            self.temperature=numpy.asarray(unpickled['temperature'],dtype=float)
+        if self._precision is None:
+            # (format version 1 stores lists)
+            isSingle=isinstance(unpickled['rawOd'],numpy.ndarray) and unpickled['rawOd'].dtype == numpy.float32
+            self._precision='float32' if isSingle else 'float64'
+        self._rawOd=numpy.ascontiguousarray(unpickled['rawOd'],dtype=self._precision)
+        # Replicate objects are created when they are accessed first (see _createReplicate)
+        self.wells=_LazyReplicates(self,unpickled['wells'],False)
+        self.replicateGroups=_LazyReplicates(self,unpickled['replicateGroup'],True)
+        # index of the replicate group each well is part of
+        self._wellReplicateGroupIndices=numpy.empty(len(self.wells),dtype=int)
+        self._wellReplicateGroupIndices.fill(-1)
+        idx=0
         for tcup in unpickled['replicateGroup']:
-            comptc=Replicate(_unpickled=tcup,parentPlate=self,_serialiseFormat=unpickled['format'],isReplicateGroup=True)
-            self.replicateGroups.append(comptc)
-            # set parental replicate group of the children
-            for childtc in comptc.childWells():
-                childtc._setReplicateGroupParent(comptc)
+            self._wellReplicateGroupIndices[tcup['wellIndices']]=idx
+            idx+=1
 
-        # deferred to here: set the background index
-        for tc in self.wells:
-            if tc._tmp_backgroundIndex is not None:
-                tc._setBackgroundIndex(tc._tmp_backgroundIndex)
-        for tc in self.replicateGroups:
-            if tc._tmp_backgroundIndex is not None:
-                tc._setBackgroundIndex(tc._tmp_backgroundIndex)
         # reset background indices, as these have been initialised
         # before setting the replicate's backgrounds
         self._backgroundWellIndices=None
         self._backgroundGroupIndices=None
+        self._backgroundDependents=None
+        self._replicateGroupIndexOfWellIndices=None
 
         self._setBackgroundStatus()
 
-    def _serialise(self):
+    def _createReplicate(self,replicates,idx):
+        """
+        Create a Replicate object of a deserialised plate.
+
+        For internal use only.
+
+        :param replicates: The wells or replicate groups.
+        :type replicates: _LazyReplicates
+        :param idx: Index of the replicate.
+        :type idx: int
+
+        :return: Replicate -- the new object.
+
+        The links to the replicate group a well is part of and to the
+        background are set up, creating these objects if necessary.
+        """
+        tc=Replicate(_unpickled=replicates.descriptors[idx],parentPlate=self,_serialiseFormat='opticaldensityplate',
+                     isReplicateGroup=replicates.isReplicateGroup)
+        replicates.objects[idx]=tc
+        if replicates.isReplicateGroup:
+            # set parental replicate group of the children that exist already
+            for wellIdx in tc.childWellIndices():
+                if self.wells.objects[wellIdx] is not None:
+                    self.wells.objects[wellIdx]._setReplicateGroupParent(tc)
+        elif self._wellReplicateGroupIndices[idx] >= 0:
+            tc._setReplicateGroupParent(self.replicateGroups[self._wellReplicateGroupIndices[idx]])
+        # (nothing is memoised yet, so no need to call _setBackgroundIndex)
+        if tc._tmp_backgroundIndex is not None:
+            tc._backgroundIndex=tc._tmp_backgroundIndex
+            tc.background=self.replicateGroups[tc._backgroundIndex]
+        return tc
+
+    @staticmethod
+    def _replicateMetadata(replicates,idx):
+        """
+        Return sample id, condition and background index of a well or replicate group.
+
+        For internal use only.
+
+        :param replicates: The wells or replicate groups.
+        :type replicates: list(Replicate)
+        :param idx: Index of the replicate.
+        :type idx: int
+
+        :return: str, str, int -- sample id, condition and index of the background replicate group.
+
+        Replicate objects of a deserialised plate are not created.
+        """
+        if isinstance(replicates,_LazyReplicates) and replicates.objects[idx] is None:
+            descriptor=replicates.descriptors[idx]
+            return descriptor['sampleId'], descriptor['condition'], descriptor['backgroundIndex']
+        tc=replicates[idx]
+        return tc.sampleid, tc.condition, tc._backgroundIndex
+
+    def _serialise(self,formatversion='1'):
         """
         Generates a dictionary of the plate data and parameters.
 
         For internal use only.
+
+        :param formatversion: Version of the serialisation format, for '2' time, temperature and raw optical densities are numpy arrays (see :py:mod:`platereader.serialisation`).
+        :type formatversion: str
         """
         parkeys=[
             # default parameters
@@ -253,32 +400,48 @@ class Plate(object):
             ]
         sr=dict()
         sr["format"]='opticaldensityplate'
-        sr["formatversion"]='1' # this is an unsigned integer
+        sr["formatversion"]=formatversion # this is an unsigned integer
         sr['plateId']=self.plateId
-        sr['time']=self.time.tolist()
+        sr['time']=self.time.tolist() if formatversion == '1' else self.time
         sr['timeunit']=self.timeunit
         for key in parkeys:
             sr[key]=self._inheritableParameters[key]
         if self.temperature is not None:
-            sr['temperature']=self.temperature.tolist()
-        sr['rawOd']=[]
-        for raw in self._rawOd:
-            sr['rawOd'].append(raw.tolist())
-        sr['wells']=[]
-        for tc in self.wells:
-            sr['wells'].append(tc._serialise())
-        sr['replicateGroup']=[]
-        for tc in self.replicateGroups:
-            sr['replicateGroup'].append(tc._serialise())
+            sr['temperature']=self.temperature.tolist() if formatversion == '1' else self.temperature
+        sr['rawOd']=self._rawOd.tolist() if formatversion == '1' else self._rawOd
+        for key, replicates in (('wells',self.wells),('replicateGroup',self.replicateGroups)):
+            sr[key]=[]
+            for idx in range(len(replicates)):
+                if isinstance(replicates,_LazyReplicates) and replicates.objects[idx] is None:
+                    # the serialisation this replicate would be created from
+                    sr[key].append(replicates.descriptors[idx])
+                else:
+                    sr[key].append(replicates[idx]._serialise())
 
         return sr
 
-    def save(self,filename):
+    def save(self,filename,saveResultCache=False,formatversion='1',compression='bz2',compressionLevel=None):
         """
         Saves the plate content in a file.
 
         :param filename: Name of the file.
         :type filename: str
+        :param saveResultCache: Also save the results calculated so far (see :py:meth:`saveResultCache <.Plate.saveResultCache>`).
+        :type saveResultCache: bool
+        :param formatversion: Version of the file format: '1' (JSON) or '2' (binary, see :py:mod:`platereader.serialisation`).
+        :type formatversion: str
+        :param compression: 'bz2', 'gzip', 'zlib', 'lzma' or None (see :py:func:`serialisation.writeCompressed <platereader.serialisation.writeCompressed>`). Uncompressed files are larger, but for format version '2' the optical densities are memory-mapped when loaded, i.e. only read from disk when needed.
+        :type compression: str
+        :param compressionLevel: Compression level from 0 to 9, lower is faster.
+        :type compressionLevel: int
+
+        The codec is detected when the file is loaded, e.g. autosaves
+        can use fast settings ('gzip' with level 1) and archives the
+        best compression ('lzma' with level 9).
+
+        Released versions of GATHODE only open files of format
+        version '1' compressed with 'bz2' (the defaults). Format
+        version '2' and the other codecs need this version.
 
         :return: StatusMessage/None -- non-fatal notifications.
         """
@@ -291,13 +454,105 @@ class Plate(object):
                          +'This means that a future version of this program will not be able to open this file with the graphical user interface. '
                          +'Please make save the file with the ".gat" extension.'),
                 severity=Severity.warning)
-        sr=self._serialise()
-        pickled = json.dumps(sr)
-        with bz2.BZ2File(filename, 'w') as wfile:
-            wfile.write(pickled.encode('utf-8'))
+        if formatversion not in ['1','2']:
+            raise RuntimeError('unknown format version "'+str(formatversion)+'"')
+        sr=self._serialise(formatversion)
+        if formatversion == '1':
+            pickled = json.dumps(sr).encode('utf-8')
+        else:
+            pickled = packBinary(sr)
+        # write to a temporary file first: the raw optical densities
+        # may be memory-mapped from the file that is overwritten
+        tmpfilename=filename+'.tmp'
+        writeCompressed(tmpfilename,pickled,compression,compressionLevel)
+        if hasattr(os,'replace'):
+            os.replace(tmpfilename,filename)
+        else:
+            # Python 2 (on POSIX rename replaces an existing file)
+            os.rename(tmpfilename,filename)
+        if saveResultCache:
+            self.saveResultCache(filename)
         self.modified=False
         return status
 
+    # memoised results of the replicates that are saved in the result cache
+    _resultCacheMemoisedKeys=[
+        'expFitsOd0Mu',
+        'expFitsMu',
+        'smoothedOd',
+        'smoothedOdDerivative',
+        'logOdSmoothed',
+        'logOdDerivativeFromNonLogSmoothed',
+        '_maxGrowthrate_expfit',
+        '_maxGrowthrate_expfit_nodetails',
+        '_maxGrowthrate_nonlogsmoothed',
+        '_maxGrowthrate_nonlogsmoothed_nodetails',
+        'odSlopemaxIntercept',
+        '_growthyield',
+        '_growthyield_smoothed',
+        ]
+
+    def saveResultCache(self,filename):
+        """
+        Save the results that are expensive to calculate beside the plate file.
+
+        :param filename: Name of the plate (gat) file.
+        :type filename: str
+
+        The results (exponential fits, smoothing splines and growth
+        parameters) are written to filename+'.cache', together with
+        the parameters they were calculated with. A plate opened with
+        Plate(filename,resultCache=True) uses these results as long
+        as the raw data did not change, results for parameters that
+        differ are calculated as usual.
+
+        All results of the cache are held in memory from the first
+        query of a result until they are used (the result cache
+        budget, see :py:meth:`setResultCacheBudget
+        <.Plate.setResultCacheBudget>`, does not apply to them), i.e.
+        about as much memory as the size of the cache file.
+        """
+        entries=[]
+        for isGroup, tcs in ((False,self.wells),(True,self.replicateGroups)):
+            idx=-1
+            for tc in tcs:
+                idx+=1
+                for key in Plate._resultCacheMemoisedKeys:
+                    if dict.__contains__(tc._memoised,key) and tc._memoised.signatures.get(key) is not None:
+                        entries.append((isGroup,idx,key,tc._memoised.signatures[key],tc._memoised[key]))
+        writeResultCache(resultCacheFilename(filename),plateDigest(self),entries)
+
+    def _openResultCache(self,filename):
+        """
+        Check the result cache and remember it for loading on first use.
+
+        For internal use only.
+
+        A result cache of different raw data is ignored.
+        """
+        if not os.path.exists(filename):
+            return
+        digest, offset = readResultCacheHeader(filename)
+        if digest is not None and digest == plateDigest(self):
+            self._pendingResultCache=(filename,offset)
+
+    def _loadResultCache(self):
+        """
+        Read the results of the result cache and keep them until they are used.
+
+        For internal use only.
+
+        They are restored like previous versions of memoised results,
+        but are not limited by the budget of the latter (see
+        :py:meth:`setResultCacheBudget <.Plate.setResultCacheBudget>`).
+        """
+        filename, offset = self._pendingResultCache
+        self._pendingResultCache=None
+        for isGroup, idx, key, signature, value in readResultCacheEntries(filename,offset):
+            tcs=self.replicateGroups if isGroup else self.wells
+            if idx < len(tcs):
+                self._resultCacheMemoised.setdefault(tcs[idx],{}).setdefault(key,{})[signature]=value
+
     def _explicitlySetParsInChildWells(self,par):
         """
         Explicitly set parameters in wells to their inherited values.
@@ -456,8 +711,8 @@ class Plate(object):
         :param time: array of timepoints when optical density was measured
         :type time: numpy.array(float)
 
-        :param rawOd: list of optical density arrays
-        :type rawOd: list( numpy.array(float) )
+        :param rawOd: optical densities, one row per well (a list of arrays is stacked into a matrix)
+        :type rawOd: numpy.array(float) or list( numpy.array(float) )
 
         :param sampleIds: list of sample names corresponding to the array of optical densities
         :type sampleIds: list(str)
@@ -487,7 +742,12 @@ class Plate(object):
         self.time=time/3600.
         self.timeunit="h"
 
-        self._rawOd=rawOd
+        # one C-contiguous (wells x timepoints) matrix, single wells use views of its rows
+        if self._precision is None:
+            self._precision='float64'
+        self._rawOd=numpy.ascontiguousarray(rawOd,dtype=self._precision)
+        if self._rawOd.ndim != 2 or self._rawOd.shape[1] != len(time):
+            raise RuntimeError('optical densities should be a (wells x timepoints) matrix')
 
         # make sure that background is correctly identified even if case is different
         newSampleIds=[]
@@ -552,7 +812,7 @@ class Plate(object):
             raise Plate.BadMetadata(str(message))
 
         # propagate parameters to the wells before deleting replicate groups
-        for par in self.wells[0]._inheritableParameters.keys():
+        for par in Replicate._inheritableParameterNames:
             self._explicitlySetParsInChildWells(par)
 
         # clear everything that depends on metadata
@@ -571,7 +831,7 @@ class Plate(object):
         self._setBackgroundForAllReplicates(self._guessBackgroundSampleIds())
 
         # propagate parameters from the wells to the replicate groups (or plate) if possible
-        for par in self.wells[0]._inheritableParameters.keys():
+        for par in Replicate._inheritableParameterNames:
             self._reduceExplicitParameter(par)
 
     def wellMetadata(self):
@@ -587,25 +847,29 @@ class Plate(object):
 
     def _setupBackgroundIndices(self):
         """
-        Set self._backgroundGroupIndices and self._backgroundWellIndices.
+        Set self._backgroundGroupIndices, self._backgroundWellIndices and self._backgroundDependents.
 
         Records the indices of tc.background (which are rpelicate
         groups) for all wells and replicateGroups and also the indices
-        of the underlying background wells.
+        of the underlying background wells. For each background
+        replicate group the indices of the wells and replicate groups
+        it is the background of are recorded, too.
 
         For internal use only.
         """
         self._backgroundGroupIndices=set()
         self._backgroundWellIndices=set()
-
-        if self.wells:
-            for tc in self.wells:
-                if tc.background:
-                    self._backgroundGroupIndices.add(self._indexOfReplicateGroup(tc.background))
-        if self.replicateGroups:
-            for tc in self.replicateGroups:
-                if tc.background:
-                    self._backgroundGroupIndices.add(self._indexOfReplicateGroup(tc.background))
+        self._backgroundDependents={}
+
+        for replicates, isReplicateGroup in ((self.wells,False),(self.replicateGroups,True)):
+            if replicates:
+                for idx in range(len(replicates)):
+                    sampleid, condition, backgroundIndex = Plate._replicateMetadata(replicates,idx)
+                    if backgroundIndex is not None:
+                        self._backgroundGroupIndices.add(backgroundIndex)
+                        if backgroundIndex not in self._backgroundDependents:
+                            self._backgroundDependents[backgroundIndex]=([],[])
+                        self._backgroundDependents[backgroundIndex][1 if isReplicateGroup else 0].append(idx)
 
         for idx in self._backgroundGroupIndices:
             for chldidx in self.replicateGroups[idx].childWellIndices():
@@ -638,9 +902,9 @@ class Plate(object):
 
         backgroundSampleIds=set()
         for idx in self.backgroundReplicateGroupIndices():
-            backgroundSampleIds.add(self.replicateGroups[idx].sampleid)
+            backgroundSampleIds.add(Plate._replicateMetadata(self.replicateGroups,idx)[0])
         for idx in self.backgroundWellIndices():
-            backgroundSampleIds.add(self.wells[idx].sampleid)
+            backgroundSampleIds.add(Plate._replicateMetadata(self.wells,idx)[0])
 
         if len(backgroundSampleIds) < 1:
             self._loadStatus.addStatus(
@@ -653,21 +917,18 @@ class Plate(object):
             return
 
         noBackground={}
-        for tc in self.nonBackgroundWells():
-            if tc.background is None:
-                if tc.condition not in noBackground:
-                    noBackground[tc.condition]={}
-                if tc.sampleid not in noBackground[tc.condition]:
-                    noBackground[tc.condition][tc.sampleid]=[]
-                noBackground[tc.condition][tc.sampleid].append(tc)
-
-        for tc in self.nonBackgroundReplicates():
-            if tc.background is None:
-                if tc.condition not in noBackground:
-                    noBackground[tc.condition]={}
-                if tc.sampleid not in noBackground[tc.condition]:
-                    noBackground[tc.condition][tc.sampleid]=[]
-                noBackground[tc.condition][tc.sampleid].append(tc)
+        for replicates, backgroundIndices in ((self.wells,self.backgroundWellIndices()),
+                                              (self.replicateGroups,self.backgroundReplicateGroupIndices())):
+            for idx in range(len(replicates)):
+                if idx in backgroundIndices:
+                    continue
+                sampleid, condition, backgroundIndex = Plate._replicateMetadata(replicates,idx)
+                if backgroundIndex is None:
+                    if condition not in noBackground:
+                        noBackground[condition]={}
+                    if sampleid not in noBackground[condition]:
+                        noBackground[condition][sampleid]=[]
+                    noBackground[condition][sampleid].append(idx)
 
         if len(noBackground.keys()):
             affected=''
@@ -739,21 +1000,19 @@ class Plate(object):
         # gather sampleids and conditions
         self._conditionToWellIdx={}
         self._sampleConditionToWellIdcs={}
-        tcidx=0
-        for tc in self.wells:
+        for tcidx in range(len(self.wells)):
+            sampleid, condition, backgroundIndex = Plate._replicateMetadata(self.wells,tcidx)
             # add well to the condition mapping
-            if tc.condition not in self._conditionToWellIdx:
-                self._conditionToWellIdx[tc.condition]=[]
-            self._conditionToWellIdx[tc.condition].append(tcidx)
+            if condition not in self._conditionToWellIdx:
+                self._conditionToWellIdx[condition]=[]
+            self._conditionToWellIdx[condition].append(tcidx)
     
             # add well to the replicate mapping (sampleid and condition)
-            if tc.sampleid not in self._sampleConditionToWellIdcs:
-                self._sampleConditionToWellIdcs[tc.sampleid]={}
-            if tc.condition not in self._sampleConditionToWellIdcs[tc.sampleid]:
-                self._sampleConditionToWellIdcs[tc.sampleid][tc.condition]=[]
-            self._sampleConditionToWellIdcs[tc.sampleid][tc.condition].append(tcidx)
-    
-            tcidx+=1
+            if sampleid not in self._sampleConditionToWellIdcs:
+                self._sampleConditionToWellIdcs[sampleid]={}
+            if condition not in self._sampleConditionToWellIdcs[sampleid]:
+                self._sampleConditionToWellIdcs[sampleid][condition]=[]
+            self._sampleConditionToWellIdcs[sampleid][condition].append(tcidx)
 
     def _createReplicateGroupsFromSampleIdsNConditions(self):
         """
@@ -766,6 +1025,7 @@ class Plate(object):
         sampleids=list(self._sampleConditionToWellIdcs.keys())
         sampleids.sort()
         self.replicateGroups=[]
+        self._replicateGroupIndexOfWellIndices=None
         for sampleid in sampleids:
             conditions=list(self._sampleConditionToWellIdcs[sampleid].keys())
             conditions.sort()
@@ -784,14 +1044,13 @@ class Plate(object):
         For internal use only.
         """
         self._sampleConditionToReplicateGroupIdcs={}
-        coidx=0
-        for tc in self.replicateGroups:
-            if tc.sampleid not in self._sampleConditionToReplicateGroupIdcs:
-                self._sampleConditionToReplicateGroupIdcs[tc.sampleid]={}
-            if tc.condition not in self._sampleConditionToReplicateGroupIdcs[tc.sampleid]:
-                self._sampleConditionToReplicateGroupIdcs[tc.sampleid][tc.condition]=[]
-            self._sampleConditionToReplicateGroupIdcs[tc.sampleid][tc.condition].append(coidx)
-            coidx+=1
+        for coidx in range(len(self.replicateGroups)):
+            sampleid, condition, backgroundIndex = Plate._replicateMetadata(self.replicateGroups,coidx)
+            if sampleid not in self._sampleConditionToReplicateGroupIdcs:
+                self._sampleConditionToReplicateGroupIdcs[sampleid]={}
+            if condition not in self._sampleConditionToReplicateGroupIdcs[sampleid]:
+                self._sampleConditionToReplicateGroupIdcs[sampleid][condition]=[]
+            self._sampleConditionToReplicateGroupIdcs[sampleid][condition].append(coidx)
 
     def _createConditionToReplicateGroupIndices(self):
         """
@@ -800,13 +1059,12 @@ class Plate(object):
         For internal use only.
         """
         self._conditionToReplicateGroupIdx={}
-        coidx=0
-        for tc in self.replicateGroups:
+        for coidx in range(len(self.replicateGroups)):
+            sampleid, condition, backgroundIndex = Plate._replicateMetadata(self.replicateGroups,coidx)
             # add replicate group to the condition mapping
-            if tc.condition not in self._conditionToReplicateGroupIdx:
-                self._conditionToReplicateGroupIdx[tc.condition]=[]
-            self._conditionToReplicateGroupIdx[tc.condition].append(coidx)
-            coidx+=1
+            if condition not in self._conditionToReplicateGroupIdx:
+                self._conditionToReplicateGroupIdx[condition]=[]
+            self._conditionToReplicateGroupIdx[condition].append(coidx)
 
     def _setBackgroundForAllReplicates(self,backgroundSampleIds):
         """
@@ -818,6 +1076,7 @@ class Plate(object):
         """
         self._backgroundWellIndices=None
         self._backgroundGroupIndices=None
+        self._backgroundDependents=None
 
         if backgroundSampleIds is None or not len(backgroundSampleIds):
             if self.wells is not None:
@@ -939,11 +1198,9 @@ class Plate(object):
         """
         backgroundIndices=self.backgroundReplicateGroupIndices()
         nbckg=[]
-        idx=0
-        for tc in self.replicateGroups:
+        for idx in range(len(self.replicateGroups)):
             if idx not in backgroundIndices:
-                nbckg.append(tc)
-            idx+=1
+                nbckg.append(self.replicateGroups[idx])
         return nbckg
 
     def nonBackgroundReplicateIndices(self):
@@ -952,11 +1209,9 @@ class Plate(object):
         """
         backgroundIndices=self.backgroundReplicateGroupIndices()
         nbckgidcs=[]
-        idx=0
-        for tc in self.replicateGroups:
+        for idx in range(len(self.replicateGroups)):
             if idx not in backgroundIndices:
                 nbckgidcs.append(idx)
-            idx+=1
         return nbckgidcs
 
     def nonBackgroundWells(self):
@@ -965,11 +1220,9 @@ class Plate(object):
         """
         backgroundIndices=self.backgroundWellIndices()
         nbckg=[]
-        idx=0
-        for tc in self.wells:
+        for idx in range(len(self.wells)):
             if idx not in backgroundIndices:
-                nbckg.append(tc)
-            idx+=1
+                nbckg.append(self.wells[idx])
         return nbckg
 
     def _indexOfReplicateGroup(self,ctc):
@@ -984,17 +1237,34 @@ class Plate(object):
         if self.replicateGroups is None:
             return None
 
-        idx=0
-        idxOfTc=None
-        for ttc in self.replicateGroups:
-            if ttc._wellIndices == ctc._wellIndices:
-                if idxOfTc is not None:
-                    raise RuntimeError("multiple similar replicate groups?")
-                else:
-                    idxOfTc=idx
-            idx+=1
+        if self._replicateGroupIndexOfWellIndices is None:
+            self._setupReplicateGroupIndexOfWellIndices()
+        key=tuple(ctc._wellIndices)
+        if key not in self._replicateGroupIndexOfWellIndices:
+            return None
+        if self._replicateGroupIndexOfWellIndices[key] is None:
+            raise RuntimeError("multiple similar replicate groups?")
+        return self._replicateGroupIndexOfWellIndices[key]
+
+    def _setupReplicateGroupIndexOfWellIndices(self):
+        """
+        Set self._replicateGroupIndexOfWellIndices.
 
-        return idxOfTc
+        Maps the well indices of each replicate group to its index
+        (None if multiple replicate groups consist of the same wells).
+
+        For internal use only.
+        """
+        self._replicateGroupIndexOfWellIndices={}
+        for idx in range(len(self.replicateGroups)):
+            if isinstance(self.replicateGroups,_LazyReplicates) and self.replicateGroups.objects[idx] is None:
+                key=tuple(self.replicateGroups.descriptors[idx]['wellIndices'])
+            else:
+                key=tuple(self.replicateGroups[idx]._wellIndices)
+            if key in self._replicateGroupIndexOfWellIndices:
+                self._replicateGroupIndexOfWellIndices[key]=None
+            else:
+                self._replicateGroupIndexOfWellIndices[key]=idx
 
     def _parametersUpdated(self,par=None):
         """
@@ -1002,7 +1272,7 @@ class Plate(object):
 
         For internal use only.
 
-        :param par: The name of the parameter that was changed.
+        :param par: The name of the parameter that was changed (or a list of names).
         :type par: str
 
         The Replicate objects memoise some results that are expensive
@@ -1010,15 +1280,331 @@ class Plate(object):
         be valid anymore and should get removed from the "cache".
         If par is given, this method can decide which results should
         be removed.
+
+        Within :py:meth:`batchUpdate <.Plate.batchUpdate>` this is
+        deferred until the batch is finished.
         """
 
+        if self._batchUpdateDepth > 0:
+            self._batchUpdatePars.add(par)
+            self.modified=True
+            return
         # only needed for non-background replicate groups (as background does not depend on parameters)
         for tc in self.nonBackgroundWells():
             tc._parametersUpdated(par,dontRecurse=True)
         for tc in self.nonBackgroundReplicates():
             tc._parametersUpdated(par,dontRecurse=True)
+        self._clearMemoised(par)
+        self.modified=True
+
+    @contextlib.contextmanager
+    def batchUpdate(self):
+        """
+        Context manager deferring the clearing of memoised results when parameters are set.
+
+        Setting a plate parameter clears the memoised results of all
+        replicates that depend on it. Within
+
+        .. code-block:: python
+
+            with plate.batchUpdate():
+                plate.setLogOdCutoff(-4)
+                plate.setSmoothingS(0.02)
+
+        this is done only once when the block is left, for all
+        parameters that were set. Results should not be queried
+        within the block, they may have been calculated with the
+        previous parameters. Such results are discarded when the
+        block is left (they are not kept as previous versions, see
+        :py:meth:`setResultCacheBudget <.Plate.setResultCacheBudget>`).
+        """
+        self._batchUpdateDepth+=1
+        try:
+            yield self
+        finally:
+            self._batchUpdateDepth-=1
+            if self._batchUpdateDepth == 0 and len(self._batchUpdatePars):
+                pars=self._batchUpdatePars
+                self._batchUpdatePars=set()
+                self._parametersUpdated(None if None in pars else sorted(pars))
+
+    # plate-wide matrices and the Replicate memoised results their rows correspond to
+    _matrixToReplicateMemoised={
+        'odMatrix': 'od',
+        'logOdMatrix': 'logOd',
+        'derivativeMatrix': 'derivative',
+        'smoothedOdMatrix': 'smoothedOd',
+        'logOdSmoothedMatrix': 'logOdSmoothed',
+        }
+
+    def _clearMemoised(self,par=None):
+        """
+        Clear memoised plate-wide matrices.
+
+        For internal use only.
+
+        :param par: The name of the parameter that was changed (or a list of names).
+        :type par: str
+
+        A matrix is kept if the corresponding result of the
+        replicates does not depend on par (see
+        :py:meth:`Replicate._memoisedDependingOn
+        <.Replicate._memoisedDependingOn>`).
+        """
+        dependents=Replicate._memoisedDependingOn(par)
+        if dependents is None:
+            self._memoised.clear()
+            return
+        for key in list(self._memoised.keys()):
+            if Plate._matrixToReplicateMemoised[key] in dependents:
+                self._memoised.pop(key)
+
+    # memory (in bytes) previous versions of memoised results may use
+    _defaultPreviousMemoisedBudget=64*1024*1024
+    # maximal number of previous versions kept for each result of a replicate
+    _previousMemoisedVersions=4
+
+    def setResultCacheBudget(self,nbytes):
+        """
+        Set the memory used for keeping previous versions of results.
+
+        :param nbytes: Number of bytes, 0 disables keeping previous versions.
+        :type nbytes: int
+
+        When a parameter changes, results of the replicates calculated
+        with the old value are kept, so changing the parameter back
+        does not recalculate them. The least recently kept results
+        are discarded first when the budget is exceeded.
+        """
+        if nbytes < 0:
+            raise RuntimeError('result cache budget should not be negative')
+        self._previousMemoisedBudget=nbytes
+        self._evictPreviousMemoised()
+
+    def resultCacheBudget(self):
+        """
+        :return: int -- Memory (in bytes) used for keeping previous versions of results.
+
+        See :py:meth:`setResultCacheBudget <.Plate.setResultCacheBudget>`.
+        """
+        return self._previousMemoisedBudget
+
+    # floating point precisions optical densities and results can be stored with
+    precisions=['float64','float32']
+
+    def setPrecision(self,precision):
+        """
+        Set the floating point precision optical densities and results are stored with.
+
+        :param precision: One of :py:attr:`precisions`.
+        :type precision: str
+
+        Plate readers report optical densities with three or four
+        decimals, so 'float32' is sufficient to store them. It halves
+        the memory used by the optical densities and the memoised
+        results (and the size of uncompressed gat files). Fits and
+        aggregations are calculated in double precision regardless,
+        only their results are stored with the given precision.
+
+        All memoised results are discarded.
+        """
+        if precision not in Plate.precisions:
+            raise RuntimeError('unknown precision "'+str(precision)+'", should be one of '+', '.join(Plate.precisions))
+        if precision == self._precision:
+            return
+        self._precision=precision
+        self._rawOd=numpy.ascontiguousarray(self._rawOd,dtype=precision)
+        # memoised results hold views of the previous matrix
+        self._memoised.clear()
+        for replicates in (self.wells, self.replicateGroups):
+            if isinstance(replicates,_LazyReplicates):
+                replicates=replicates.created()
+            for tc in replicates:
+                tc._memoised.clear()
+        self._previousMemoised.clear()
+        self._previousMemoisedSignatures.clear()
+        self._previousMemoisedNbytes=0
+        self._resultCacheMemoised.clear()
         self.modified=True
 
+    def precision(self):
+        """
+        :return: str -- Floating point precision optical densities and results are stored with.
+
+        See :py:meth:`setPrecision <.Plate.setPrecision>`.
+        """
+        return self._precision
+
+    # how smoothedOd and logOdSmoothed of the replicates are calculated
+    smoothers=['univariatespline','batched']
+
+    def setSmoother(self,smoother):
+        """
+        Set how the optical densities are smoothed.
+
+        :param smoother: One of :py:attr:`smoothers`.
+        :type smoother: str
+
+        'univariatespline' (the default) fits a
+        scipy.interpolate.UnivariateSpline to each replicate.
+        'batched' smooths the optical densities of all wells at once
+        (see :py:class:`platereader.smoothing.SmoothingSplineBasis`),
+        which is considerably faster for large plates. Both use the
+        same smoothing criterion (with smoothingK and smoothingS),
+        but UnivariateSpline chooses the knots for each replicate
+        while the batched smoother uses the same knots for all of
+        them, so results differ slightly. Replicates it cannot
+        smooth (e.g. log(OD) with nan values) are smoothed with
+        UnivariateSpline.
+
+        The smoother is not saved with the plate.
+        """
+        if smoother not in Plate.smoothers:
+            raise RuntimeError('unknown smoother "'+str(smoother)+'", should be one of '+', '.join(Plate.smoothers))
+        if smoother == self._smoother:
+            return
+        self._smoother=smoother
+        self._parametersUpdated('smoother')
+
+    def smoother(self):
+        """
+        :return: str -- How the optical densities are smoothed.
+
+        See :py:meth:`setSmoother <.Plate.setSmoother>`.
+        """
+        return self._smoother
+
+    def _storedWithPrecision(self,value):
+        """
+        Return a memoised result with its floating point arrays converted to the plate's precision.
+
+        For internal use only.
+        """
+        if self._precision == 'float64':
+            # results are calculated in double precision anyway
+            return value
+        if isinstance(value,numpy.ndarray):
+            if value.dtype == numpy.float64:
+                return value.astype(self._precision)
+            return value
+        if isinstance(value,tuple):
+            return tuple([self._storedWithPrecision(v) for v in value])
+        if isinstance(value,dict):
+            return dict((k, self._storedWithPrecision(v)) for k, v in value.items())
+        return value
+
+    def _keepPreviousMemoised(self,tc,key,signature,value):
+        """
+        Keep a memoised result of a replicate that was cleared.
+
+        For internal use only.
+
+        :param tc: The replicate.
+        :type tc: Replicate
+        :param key: Key of the memoised result.
+        :type key: str
+        :param signature: Parameters the result was calculated with (see :py:meth:`Replicate._memoisedSignature <.Replicate._memoisedSignature>`).
+        :type signature: tuple
+        :param value: The memoised result.
+        """
+        nbytes=_memoisedNbytes(value)
+        if nbytes > self._previousMemoisedBudget:
+            return
+        signatures=self._previousMemoisedSignatures.setdefault(tc,{}).setdefault(key,[])
+        if signature in signatures:
+            self._removePreviousMemoised(tc,key,signature)
+        elif len(signatures) >= Plate._previousMemoisedVersions:
+            self._removePreviousMemoised(tc,key,signatures[0])
+        self._previousMemoisedSignatures.setdefault(tc,{}).setdefault(key,[]).append(signature)
+        self._previousMemoised[(tc,key,signature)]=(value,nbytes)
+        self._previousMemoisedNbytes+=nbytes
+        self._evictPreviousMemoised()
+
+    def _hasPreviousMemoised(self,tc,key):
+        """
+        Return True if there are previous versions of the memoised result of a replicate.
+
+        For internal use only.
+        """
+        if self._pendingResultCache is not None:
+            self._loadResultCache()
+        if tc in self._resultCacheMemoised and key in self._resultCacheMemoised[tc]:
+            return True
+        return tc in self._previousMemoisedSignatures and key in self._previousMemoisedSignatures[tc]
+
+    def _takePreviousMemoised(self,tc,key,signature):
+        """
+        Remove and return a previous version of the memoised result of a replicate.
+
+        For internal use only.
+
+        :return: bool, value -- whether there was a version with this signature, the memoised result.
+        """
+        if tc in self._resultCacheMemoised and key in self._resultCacheMemoised[tc]:
+            loaded=self._resultCacheMemoised[tc][key]
+            if signature in loaded:
+                value=loaded.pop(signature)
+                if not len(loaded):
+                    del self._resultCacheMemoised[tc][key]
+                    if not len(self._resultCacheMemoised[tc]):
+                        del self._resultCacheMemoised[tc]
+                return True, value
+        if (tc,key,signature) not in self._previousMemoised:
+            return False, None
+        value=self._previousMemoised[(tc,key,signature)][0]
+        self._removePreviousMemoised(tc,key,signature)
+        return True, value
+
+    def _removePreviousMemoised(self,tc,key,signature):
+        """
+        Remove a previous version of the memoised result of a replicate.
+
+        For internal use only.
+        """
+        value, nbytes = self._previousMemoised.pop((tc,key,signature))
+        self._previousMemoisedNbytes-=nbytes
+        signatures=self._previousMemoisedSignatures[tc][key]
+        signatures.remove(signature)
+        if not len(signatures):
+            del self._previousMemoisedSignatures[tc][key]
+            if not len(self._previousMemoisedSignatures[tc]):
+                del self._previousMemoisedSignatures[tc]
+
+    def _discardPreviousMemoised(self,tc):
+        """
+        Remove all previous versions of memoised results of a replicate.
+
+        For internal use only.
+        """
+        self._resultCacheMemoised.pop(tc,None)
+        if tc not in self._previousMemoisedSignatures:
+            return
+        for key in list(self._previousMemoisedSignatures[tc].keys()):
+            for signature in list(self._previousMemoisedSignatures[tc][key]):
+                self._removePreviousMemoised(tc,key,signature)
+
+    def _evictPreviousMemoised(self):
+        """
+        Remove least recently kept versions of memoised results until they fit into the budget.
+
+        For internal use only.
+        """
+        while self._previousMemoisedNbytes > self._previousMemoisedBudget and len(self._previousMemoised):
+            tc, key, signature = next(iter(self._previousMemoised))
+            self._removePreviousMemoised(tc,key,signature)
+
+    def __getstate__(self):
+        # previous versions of results are not needed by copies (e.g. in worker processes)
+        state=self.__dict__.copy()
+        state['_previousMemoised']=collections.OrderedDict()
+        state['_previousMemoisedSignatures']={}
+        state['_previousMemoisedNbytes']=0
+        state['_pendingResultCache']=None
+        state['_resultCacheMemoised']={}
+        # (recreated on first use)
+        state['_smoothingSplineBasis']=None
+        return state
+
     def _replicateChanged(self,tc,par=None):
         """
         Update replicates that depend on the given replicate.
@@ -1035,12 +1621,17 @@ class Plate(object):
         if idxOfTc is None:
             raise RuntimeError("no matching tc for "+tc.fullId())
 
-        for ptc in self.wells:
-            if ptc._backgroundIndex == idxOfTc:
-                ptc._parametersUpdated(par='backgroundRawOd')
-        for ctc in self.replicateGroups:
-            if ctc._backgroundIndex == idxOfTc:
-                ctc._parametersUpdated(par='backgroundRawOd')
+        if self._backgroundDependents is None:
+            self._setupBackgroundIndices()
+        if idxOfTc not in self._backgroundDependents:
+            return
+        wellIndices, replicateGroupIndices = self._backgroundDependents[idxOfTc]
+        for replicates, indices in ((self.wells,wellIndices),(self.replicateGroups,replicateGroupIndices)):
+            for idx in indices:
+                if isinstance(replicates,_LazyReplicates) and replicates.objects[idx] is None:
+                    # (nothing is memoised for replicates that were not created yet)
+                    continue
+                replicates[idx]._parametersUpdated(par='backgroundRawOd')
 
     def _getDefaultParameter(self,par):
         """
@@ -1069,6 +1660,21 @@ class Plate(object):
         """
         return self._getDefaultParameter(par)
 
+    def _getResolvedParameters(self):
+        """
+        Return the values of all parameters.
+
+        For internal use only.
+
+        :return: dict(str -> value) -- the plate's parameters, shared with replicates that do not override any of them (must not be modified).
+
+        See :py:meth:`Replicate.resolvedParameters <.Replicate.resolvedParameters>`.
+        """
+        if self._resolvedParametersGeneration != self._parameterGeneration:
+            self._resolvedParameters=dict(self._inheritableParameters)
+            self._resolvedParametersGeneration=self._parameterGeneration
+        return self._resolvedParameters
+
     def getParameter(self,par):
         """
         Return the requested parameter.
@@ -1153,6 +1759,7 @@ class Plate(object):
         if par not in self._inheritableParameters:
             raise RuntimeError('_setDefaultParameter: unknown parameter '+par)
         self._inheritableParameters[par]=val
+        self._parameterGeneration+=1
         self._parametersUpdated(par)
 
     def _setExplicitParameter(self,par,val):
@@ -1237,6 +1844,299 @@ class Plate(object):
             wellids.append(str(rowlabels[lblchar])+str(lblnum+1))
         return wellids
 
+    def odMatrix(self):
+        """
+        Return the background- and high-density corrected optical densities of all wells.
+
+        :return: numpy.array(float) -- (wells x timepoints) matrix, rows of wells without optical density are nan.
+
+        Background subtraction and high-density correction are done
+        for all wells at once. The result is memoised and its rows
+        are handed to the wells as their :py:meth:`Replicate.od
+        <.Replicate.od>`.
+        """
+        if 'odMatrix' in self._memoised:
+            return self._memoised['odMatrix']
+
+        numWells=len(self.wells)
+        hdcoeffs=numpy.full([3,numWells,1],numpy.nan)
+        backgroundRawOd=numpy.full([numWells,len(self.time)],numpy.nan)
+        hasOd=numpy.zeros([numWells],dtype=bool)
+        for i in range(numWells):
+            tc=self.wells[i]
+            if tc.rawOd() is None or tc.background is None or tc.background.rawOd() is None:
+                continue
+            hdcoeffs[:,i,0]=[tc.hdCorrectionLinear(),tc.hdCorrectionQuadratic(),tc.hdCorrectionCubic()]
+            if numpy.isnan(hdcoeffs[:,i,0]).any():
+                continue
+            backgroundRawOd[i]=tc.background.rawOd()
+            hasOd[i]=True
+
+        # same operations as in Replicate._calculateOd, broadcast over all wells
+        rawdiff=self._rawOd-backgroundRawOd
+        odmat=hdcoeffs[0]*rawdiff + hdcoeffs[1]*rawdiff**2 + hdcoeffs[2]*rawdiff**3
+        odmat[~hasOd]=numpy.nan
+        odmat=self._storedWithPrecision(odmat)
+        odmat.flags.writeable=False
+        self._memoised['odMatrix']=odmat
+
+        for i in range(numWells):
+            tc=self.wells[i]
+            if 'od' not in tc._memoised:
+                tc._memoised['od']=odmat[i] if hasOd[i] else None
+                tc._memoised['odVar']=None
+        return odmat
+
+    def logOdMatrix(self):
+        """
+        Return the logarithm of the corrected optical densities of all wells.
+
+        :return: numpy.array(float) -- (wells x timepoints) matrix.
+
+        See :py:meth:`odMatrix <.Plate.odMatrix>` and :py:meth:`Replicate.logOd <.Replicate.logOd>`.
+        """
+        if 'logOdMatrix' in self._memoised:
+            return self._memoised['logOdMatrix']
+
+        odmat=self.odMatrix()
+        logodmat=numpy.full(odmat.shape,numpy.nan)
+        idcs=odmat >= 1e-35 # FIXME an abitrary threshold (same as in Replicate.logOd)
+        logodmat[idcs]=numpy.log(odmat[idcs])
+        logodmat=self._storedWithPrecision(logodmat)
+        logodmat.flags.writeable=False
+        self._memoised['logOdMatrix']=logodmat
+
+        self._feedReplicateMemoised('logOd',logodmat)
+        return logodmat
+
+    def derivativeMatrix(self):
+        """
+        Return the (left) derivative of the corrected optical densities of all wells.
+
+        :return: numpy.array(float) -- (wells x timepoints-1) matrix.
+
+        See :py:meth:`odMatrix <.Plate.odMatrix>` and :py:meth:`Replicate.derivative <.Replicate.derivative>`.
+        """
+        if 'derivativeMatrix' in self._memoised:
+            return self._memoised['derivativeMatrix']
+
+        derivmat=self._storedWithPrecision(numpy.diff(self.odMatrix(),axis=1)/numpy.diff(self.time))
+        derivmat.flags.writeable=False
+        self._memoised['derivativeMatrix']=derivmat
+
+        self._feedReplicateMemoised('derivative',derivmat)
+        return derivmat
+
+    def smoothedOdMatrix(self):
+        """
+        Return the smoothed optical densities of all wells.
+
+        :return: numpy.array(float) -- (wells x timepoints) matrix, rows of wells without smoothed optical density are nan.
+
+        See :py:meth:`Replicate.smoothedOd <.Replicate.smoothedOd>`.
+        With the 'batched' smoother (see :py:meth:`setSmoother
+        <.Plate.setSmoother>`) all wells are smoothed at once.
+        """
+        return self._smoothedMatrix('smoothedOdMatrix')
+
+    def logOdSmoothedMatrix(self):
+        """
+        Return the smoothed logarithm of the optical densities of all wells.
+
+        :return: numpy.array(float) -- (wells x timepoints) matrix, rows of wells without smoothed log(OD) are nan.
+
+        See :py:meth:`Replicate.logOdSmoothed <.Replicate.logOdSmoothed>`
+        and :py:meth:`smoothedOdMatrix <.Plate.smoothedOdMatrix>`.
+        """
+        return self._smoothedMatrix('logOdSmoothedMatrix')
+
+    def _smoothedMatrix(self,matrixKey):
+        """
+        Return (and memoise) a plate-wide matrix of smoothed time series.
+
+        For internal use only.
+
+        :param matrixKey: 'smoothedOdMatrix' or 'logOdSmoothedMatrix'
+        :type matrixKey: str
+        """
+        if matrixKey in self._memoised:
+            return self._memoised[matrixKey]
+
+        key=Plate._matrixToReplicateMemoised[matrixKey]
+        if self._smoother == 'batched':
+            self._smoothBatched([tc for tc in self.wells if tc.od() is not None and key not in tc._memoised],key)
+        smoothedmat=numpy.full([len(self.wells),len(self.time)],numpy.nan)
+        for i in range(len(self.wells)):
+            tc=self.wells[i]
+            smoothed=tc.smoothedOd() if key == 'smoothedOd' else tc.logOdSmoothed()
+            if smoothed is not None:
+                smoothedmat[i]=smoothed
+        smoothedmat=self._storedWithPrecision(smoothedmat)
+        smoothedmat.flags.writeable=False
+        self._memoised[matrixKey]=smoothedmat
+        return smoothedmat
+
+    def _smoothBatched(self,replicates,key):
+        """
+        Smooth the optical densities of the given replicates at once and memoise the results.
+
+        For internal use only.
+
+        :param replicates: Replicates (wells or replicate groups of this plate) that have optical densities.
+        :type replicates: list(Replicate)
+        :param key: 'smoothedOd' or 'logOdSmoothed'
+        :type key: str
+
+        Replicates the batched smoother cannot handle are smoothed
+        individually with scipy.interpolate.UnivariateSpline.
+        """
+        if not len(replicates):
+            return
+        # smoothingK and smoothingS are plate-wide parameters
+        k=self.getParameter('smoothingK')
+        if self._smoothingSplineBasis is None or self._smoothingSplineBasis.k != k:
+            self._smoothingSplineBasis=SmoothingSplineBasis(self.time,k)
+        values=numpy.empty([len(replicates),len(self.time)])
+        for i in range(len(replicates)):
+            values[i]=replicates[i].od() if key == 'smoothedOd' else replicates[i].logOd()
+        smoothed, messages = self._smoothingSplineBasis.smooth(values,self.getParameter('smoothingS'))
+        for i in range(len(replicates)):
+            tc=replicates[i]
+            if messages[i] is None:
+                tc._memoised[key]=smoothed[i]
+            elif key == 'smoothedOd':
+                tc._memoised[key]=tc._smoothedOdUnivariateSpline()
+            else:
+                tc._memoised[key]=tc._logOdSmoothedUnivariateSpline()
+
+    def _feedReplicateMemoised(self,key,mat):
+        """
+        Memoise the rows of a plate-wide matrix in the wells.
+
+        For internal use only.
+
+        :param key: The name of the memoised result of the wells.
+        :type key: str
+        :param mat: (wells x timepoints) matrix as returned by :py:meth:`odMatrix <.Plate.odMatrix>` and friends.
+        :type mat: numpy.array(float)
+        """
+        for i in range(len(self.wells)):
+            tc=self.wells[i]
+            if key not in tc._memoised:
+                tc._memoised[key]=mat[i] if tc.od() is not None else None
+
+    def computeExpFits(self,fitOd0=True):
+        """
+        Fit exponential functions to the sliding windows of all non-background wells at once.
+
+        :param fitOd0: Fit both OD0 and mu (as :py:meth:`Replicate.expFitsOd0Mu <.Replicate.expFitsOd0Mu>`)
+                       or only mu (as :py:meth:`Replicate.expFitsMu <.Replicate.expFitsMu>`).
+        :type fitOd0: bool
+
+        All wells share the same timepoints, so the windows of all
+        rows of :py:meth:`odMatrix <.Plate.odMatrix>` are fitted in
+        one pass. The results are memoised in
+        the wells, replicate groups aggregate these when asked for
+        their fits. Wells that already have memoised fits are skipped.
+        """
+        key='expFitsOd0Mu' if fitOd0 else 'expFitsMu'
+        odmatrix=self.odMatrix()
+        wells=[]
+        wellIndices=[]
+        for tc in self.nonBackgroundWells():
+            if key not in tc._memoised and tc.od() is not None:
+                wells.append(tc)
+                wellIndices.append(tc.childWellIndices()[0])
+        if not len(wells):
+            return
+
+        # slidingWindowSize is a plate-wide parameter
+        slidingWindowSize=wells[0]._slidingWindowSizeForFit()
+        odmat=odmatrix[wellIndices]
+        mu, od0 = slidingWindowExpFit(self.time,odmat,slidingWindowSize,fitOd0=fitOd0)
+
+        for i in range(len(wells)):
+            c={}
+            c['mu'], c['muvar'] = mu[i], None
+            if fitOd0:
+                c['od0'], c['od0var'] = od0[i], None
+            wells[i]._memoised[key]=c
+
+    # memoised results of the wells that are calculated by computeAll
+    _computeAllMemoisedKeys=[
+        'expFitsOd0Mu',
+        Replicate._maxGrowthrateMemoisedKey('expfit',True),
+        Replicate._maxGrowthrateMemoisedKey('expfit',False),
+        Replicate._maxGrowthrateMemoisedKey('nonlogsmoothed',True),
+        Replicate._maxGrowthrateMemoisedKey('nonlogsmoothed',False),
+        '_growthyield_smoothed',
+        'odSlopemaxIntercept',
+        ]
+
+    def computeAll(self,workers=None,executor=None):
+        """
+        Calculate the growth parameters of all wells and replicate groups.
+
+        :param workers: Number of processes (or threads), defaults to the number of CPUs. Not used if executor is an executor object.
+        :type workers: int
+        :param executor: Executor the wells are distributed with (see :py:mod:`platereader.executor`), defaults to a pool of workers processes.
+        :type executor: SerialExecutor or str
+
+        Wells are distributed in chunks, a process works on its own
+        copy of the plate and only the results are sent back. They
+        are memoised in the wells (as if
+        :py:meth:`Replicate.maxGrowthrate <.Replicate.maxGrowthrate>`,
+        :py:meth:`Replicate.maxGrowthrateFromLogOdDerivative <.Replicate.maxGrowthrateFromLogOdDerivative>`,
+        :py:meth:`Replicate.growthyield <.Replicate.growthyield>` and
+        :py:meth:`Replicate.odSlopemaxIntercept <.Replicate.odSlopemaxIntercept>`
+        had been called). Replicate groups then aggregate the results
+        of their wells.
+        """
+        if executor is None:
+            executor=ProcessExecutor(workers)
+        else:
+            executor=getExecutor(executor,workers)
+        # exp. fits (and smoothing) of all wells at once (before the plate is copied to other processes)
+        self.computeExpFits()
+        if self._smoother == 'batched':
+            self.smoothedOdMatrix()
+        self._smoothBeforeThreads(executor)
+        wellIndices=[]
+        for tc in self.nonBackgroundWells():
+            for key in Plate._computeAllMemoisedKeys:
+                if key not in tc._memoised:
+                    wellIndices.append(tc.childWellIndices()[0])
+                    break
+
+        # contiguous chunks, a few per worker to balance the load
+        numChunks=min(len(wellIndices),4*executor.workers)
+        chunks=[wellIndices[i*len(wellIndices)//numChunks:(i+1)*len(wellIndices)//numChunks] for i in range(numChunks)]
+        results=executor.map(_computeAllWorker,chunks,context=self)
+        for chunk, chunkResults in zip(chunks,results):
+            for wellIdx, memoised in zip(chunk,chunkResults):
+                for key in memoised:
+                    if key not in self.wells[wellIdx]._memoised:
+                        self.wells[wellIdx]._memoised[key]=memoised[key]
+
+        for tc in self.nonBackgroundReplicates():
+            _computeAllForWell(tc)
+
+    def _smoothBeforeThreads(self,executor):
+        """
+        Smooth the optical densities of the wells if the executor runs tasks in threads.
+
+        For internal use only.
+
+        Whether UnivariateSpline failed is decided from the warnings
+        recorded while it is called. Warnings are recorded for the
+        whole process, i.e. a thread would also record the warnings
+        of the others and drop valid splines.
+        """
+        if not isinstance(executor,ThreadExecutor) or executor.workers < 2:
+            return
+        for tc in self.nonBackgroundWells():
+            tc.smoothedOd()
+
     @staticmethod
     def availableColumnsForCsvExport(logOdDerivativeProperties=True):
         """
@@ -1275,6 +2175,7 @@ class Plate(object):
         return fixedcolumns, columns
 
     def growthParametersToCsv(self,filename,addVarianceColumns=True,singleWells=False, columns=None, progressCall=None,
+                              executor=None,
                               **csvkwargs):
         """
         Write a "comma seperated values" (csv) file of properties for all replicate groups.
@@ -1289,11 +2190,14 @@ class Plate(object):
         :type singleWells: bool
         :param progressCall: Function that will be called on each iteration.
         :type progressCall: @fun(int)
+        :param executor: Executor calculating the rows (see :py:mod:`platereader.executor`).
+        :type executor: SerialExecutor or str
         :param csvkwargs: Parameters which are passed on to the csv module; defaults to { 'dialect': 'excel' }
         :type csvkwargs: dict()
         """
         if 'dialect' not in csvkwargs:
             csvkwargs['dialect']='excel'
+        executor=getExecutor(executor)
 
         col2collabel={
             'lag_expfit': 'lag_expfit (ln(OD) == lagAtCutoff)',
@@ -1318,6 +2222,9 @@ class Plate(object):
             replicates=self.nonBackgroundWells()
         else:
             replicates=self.nonBackgroundReplicates()
+        # fit all wells at once
+        self.computeExpFits()
+        self._smoothBeforeThreads(executor)
 
         with CsvFileUnicodeWriter(filename,**csvkwargs) as sliwriter:
             descrow=[]
@@ -1328,121 +2235,134 @@ class Plate(object):
                     descrow.append(col)
             sliwriter.writerow(descrow)
     
-            allcnt=-1
-            for tc in replicates:
-                allcnt+=1
-                if progressCall is not None:
-                    progressCall(allcnt)
-
-                if tc.od() is not None:
-                    doublingtime_ef=None
-                    doublingtimevar_ef=None
-                    doublingtime_nls=None
-                    doublingtimevar_nls=None
-                    lag_linear=None
-                    lagVar_linear=None
-                    mu_ef, mu_ef_var, od0_ef, od0_ef_var, maxt_ef, maxt_ef_var, lag_ef, lag_ef_var, method_ef, status = tc.maxGrowthrate()
-                    mu_nls, mu_nls_var, od0_nls, od0_nls_var, maxt_nls, maxt_nls_var, lag_nls, lag_nls_var, method_nls, status = tc.maxGrowthrateFromLogOdDerivative()
-                    growthyield, growthyield_var, tgrowthyield, tgrowthyield_var, status=tc.growthyield()
-                    slope_linear, slopeVar_linear, intercept_linear, interceptVar_linear, timeOfMax_linear, timeOfMaxVar_linear, timeOfMaxIndices_linear, plainSlopeStatus=tc.odSlopemaxIntercept()
-                    doublingtime_ef, doublingtimevar_ef=Replicate.growthrateToDoublingTime(mu_ef,mu_ef_var)
-                    doublingtime_nls, doublingtimevar_nls=Replicate.growthrateToDoublingTime(mu_nls,mu_nls_var)
-                    if slope_linear is not None and slope_linear != 0:
-                        lag_linear=-intercept_linear/(slope_linear)
-                        if slopeVar_linear is not None and interceptVar_linear is not None:
-                            lagVar_linear=((intercept_linear/(slope_linear**2))**2 * slopeVar_linear +
-                                            1/slope_linear**2 * interceptVar_linear)
-                else:
-                    (doublingtime_ef, doublingtimevar_ef, doublingtime_nls, doublingtimevar_nls)=(None,None,None,None)
-                    (mu_ef, mu_ef_var, od0_ef, od0_ef_var, maxt_ef, maxt_ef_var, lag_ef, lag_ef_var)=([None,None,None,None,None,None,None,None])
-                    (mu_nls, mu_nls_var, od0_nls, od0_nls_var, maxt_nls, maxt_nls_var, lag_nls, lag_nls_var)=([None,None,None,None,None,None,None,None])
-                    (growthyield,growthyield_var,tgrowthyield,tgrowthyield_var)=([None,None,None,None])
-                    (slope_linear, slopeVar_linear, intercept_linear, interceptVar_linear,
-                     timeOfMax_linear, timeOfMaxVar_linear, lag_linear, lagVar_linear)=([None,None,None,None,None,None,None,None])
-    
-                thisrow=[]
-                for col in columns:
-                    if col == 'sample':
-                        thisrow.append(tc.sampleid)
-                    elif col == 'condition':
-                        thisrow.append(tc.condition)
-                    elif col == 'slope_linear':
-                        thisrow.append(slope_linear)
-                    elif col == 'slope_linear_var':
-                        thisrow.append(slopeVar_linear)
-                    elif col == 'intercept_linear':
-                        thisrow.append(intercept_linear)
-                    elif col == 'intercept_linear_var':
-                        thisrow.append(interceptVar_linear)
-                    elif col == 'timeOfMax_linear':
-                        thisrow.append(timeOfMax_linear)
-                    elif col == 'timeOfMax_linear_var':
-                        thisrow.append(timeOfMaxVar_linear)
-                    elif col == 'lag_linear':
-                        thisrow.append(lag_linear)
-                    elif col == 'lag_linear_var':
-                        thisrow.append(lagVar_linear)
-                    elif col == 'doublingtime_expfit':
-                        thisrow.append(doublingtime_ef)
-                    elif col == 'doublingtime_expfit_var':
-                        thisrow.append(doublingtimevar_ef)
-                    elif col == 'growthrate_expfit':
-                        thisrow.append(mu_ef)
-                    elif col == 'growthrate_expfit_var':
-                        thisrow.append(mu_ef_var)
-                    elif col == 'od0_expfit':
-                        thisrow.append(od0_ef)
-                    elif col == 'od0_expfit_var':
-                        thisrow.append(od0_ef_var)
-                    elif col == 'timeOfMax_expfit':
-                        thisrow.append(maxt_ef)
-                    elif col == 'timeOfMax_expfit_var':
-                        thisrow.append(maxt_ef_var)
-                    elif col == 'lag_expfit':
-                        thisrow.append(lag_ef)
-                    elif col == 'lag_expfit_var':
-                        thisrow.append(lag_ef_var)
-                    elif col == 'doublingtime_local':
-                        thisrow.append(doublingtime_nls)
-                    elif col == 'doublingtime_local_var':
-                        thisrow.append(doublingtimevar_nls)
-                    elif col == 'growthrate_local':
-                        thisrow.append(mu_nls)
-                    elif col == 'growthrate_local_var':
-                        thisrow.append(mu_nls_var)
-                    elif col == 'od0_local':
-                        thisrow.append(od0_nls)
-                    elif col == 'od0_local_var':
-                        thisrow.append(od0_nls_var)
-                    elif col == 'timeOfMax_local':
-                        thisrow.append(maxt_nls)
-                    elif col == 'timeOfMax_local_var':
-                        thisrow.append(maxt_nls_var)
-                    elif col == 'lag_local':
-                        thisrow.append(lag_nls)
-                    elif col == 'lag_local_var':
-                        thisrow.append(lag_nls_var)
-                    elif col == 'yield':
-                        thisrow.append(growthyield)
-                    elif col == 'yield_var':
-                        thisrow.append(growthyield_var)
-                    elif col == 'timeOfYield':
-                        thisrow.append(tgrowthyield)
-                    elif col == 'timeOfYield_var':
-                        thisrow.append(tgrowthyield_var)
-                    elif col == 'wellids':
-                        thisrow.append(tc.activeChildWellIdStr())
-                    else:
-                        raise RuntimeError('unknown property '+col)
-    
+            rows=executor.map(_growthParametersCsvWorker,range(len(replicates)),
+                              context=(replicates,columns),progressCall=progressCall)
+            for thisrow in rows:
                 sliwriter.writerow(thisrow)
 
+    def _growthParametersCsvRow(self,tc,columns):
+        """
+        Return the properties of a replicate for :py:meth:`growthParametersToCsv <.Plate.growthParametersToCsv>`.
+
+        For internal use only.
+
+        :param tc: The replicate.
+        :type tc: Replicate
+        :param columns: List of properties (in that order).
+        :type columns: list(str)
+
+        :return: list -- the values of the properties.
+        """
+        if tc.od() is not None:
+            doublingtime_ef=None
+            doublingtimevar_ef=None
+            doublingtime_nls=None
+            doublingtimevar_nls=None
+            lag_linear=None
+            lagVar_linear=None
+            mu_ef, mu_ef_var, od0_ef, od0_ef_var, maxt_ef, maxt_ef_var, lag_ef, lag_ef_var, method_ef, status = tc.maxGrowthrate()
+            mu_nls, mu_nls_var, od0_nls, od0_nls_var, maxt_nls, maxt_nls_var, lag_nls, lag_nls_var, method_nls, status = tc.maxGrowthrateFromLogOdDerivative()
+            growthyield, growthyield_var, tgrowthyield, tgrowthyield_var, status=tc.growthyield()
+            slope_linear, slopeVar_linear, intercept_linear, interceptVar_linear, timeOfMax_linear, timeOfMaxVar_linear, timeOfMaxIndices_linear, plainSlopeStatus=tc.odSlopemaxIntercept()
+            doublingtime_ef, doublingtimevar_ef=Replicate.growthrateToDoublingTime(mu_ef,mu_ef_var)
+            doublingtime_nls, doublingtimevar_nls=Replicate.growthrateToDoublingTime(mu_nls,mu_nls_var)
+            if slope_linear is not None and slope_linear != 0:
+                lag_linear=-intercept_linear/(slope_linear)
+                if slopeVar_linear is not None and interceptVar_linear is not None:
+                    lagVar_linear=((intercept_linear/(slope_linear**2))**2 * slopeVar_linear +
+                                    1/slope_linear**2 * interceptVar_linear)
+        else:
+            (doublingtime_ef, doublingtimevar_ef, doublingtime_nls, doublingtimevar_nls)=(None,None,None,None)
+            (mu_ef, mu_ef_var, od0_ef, od0_ef_var, maxt_ef, maxt_ef_var, lag_ef, lag_ef_var)=([None,None,None,None,None,None,None,None])
+            (mu_nls, mu_nls_var, od0_nls, od0_nls_var, maxt_nls, maxt_nls_var, lag_nls, lag_nls_var)=([None,None,None,None,None,None,None,None])
+            (growthyield,growthyield_var,tgrowthyield,tgrowthyield_var)=([None,None,None,None])
+            (slope_linear, slopeVar_linear, intercept_linear, interceptVar_linear,
+             timeOfMax_linear, timeOfMaxVar_linear, lag_linear, lagVar_linear)=([None,None,None,None,None,None,None,None])
+
+        thisrow=[]
+        for col in columns:
+            if col == 'sample':
+                thisrow.append(tc.sampleid)
+            elif col == 'condition':
+                thisrow.append(tc.condition)
+            elif col == 'slope_linear':
+                thisrow.append(slope_linear)
+            elif col == 'slope_linear_var':
+                thisrow.append(slopeVar_linear)
+            elif col == 'intercept_linear':
+                thisrow.append(intercept_linear)
+            elif col == 'intercept_linear_var':
+                thisrow.append(interceptVar_linear)
+            elif col == 'timeOfMax_linear':
+                thisrow.append(timeOfMax_linear)
+            elif col == 'timeOfMax_linear_var':
+                thisrow.append(timeOfMaxVar_linear)
+            elif col == 'lag_linear':
+                thisrow.append(lag_linear)
+            elif col == 'lag_linear_var':
+                thisrow.append(lagVar_linear)
+            elif col == 'doublingtime_expfit':
+                thisrow.append(doublingtime_ef)
+            elif col == 'doublingtime_expfit_var':
+                thisrow.append(doublingtimevar_ef)
+            elif col == 'growthrate_expfit':
+                thisrow.append(mu_ef)
+            elif col == 'growthrate_expfit_var':
+                thisrow.append(mu_ef_var)
+            elif col == 'od0_expfit':
+                thisrow.append(od0_ef)
+            elif col == 'od0_expfit_var':
+                thisrow.append(od0_ef_var)
+            elif col == 'timeOfMax_expfit':
+                thisrow.append(maxt_ef)
+            elif col == 'timeOfMax_expfit_var':
+                thisrow.append(maxt_ef_var)
+            elif col == 'lag_expfit':
+                thisrow.append(lag_ef)
+            elif col == 'lag_expfit_var':
+                thisrow.append(lag_ef_var)
+            elif col == 'doublingtime_local':
+                thisrow.append(doublingtime_nls)
+            elif col == 'doublingtime_local_var':
+                thisrow.append(doublingtimevar_nls)
+            elif col == 'growthrate_local':
+                thisrow.append(mu_nls)
+            elif col == 'growthrate_local_var':
+                thisrow.append(mu_nls_var)
+            elif col == 'od0_local':
+                thisrow.append(od0_nls)
+            elif col == 'od0_local_var':
+                thisrow.append(od0_nls_var)
+            elif col == 'timeOfMax_local':
+                thisrow.append(maxt_nls)
+            elif col == 'timeOfMax_local_var':
+                thisrow.append(maxt_nls_var)
+            elif col == 'lag_local':
+                thisrow.append(lag_nls)
+            elif col == 'lag_local_var':
+                thisrow.append(lag_nls_var)
+            elif col == 'yield':
+                thisrow.append(growthyield)
+            elif col == 'yield_var':
+                thisrow.append(growthyield_var)
+            elif col == 'timeOfYield':
+                thisrow.append(tgrowthyield)
+            elif col == 'timeOfYield_var':
+                thisrow.append(tgrowthyield_var)
+            elif col == 'wellids':
+                thisrow.append(tc.activeChildWellIdStr())
+            else:
+                raise RuntimeError('unknown property '+col)
+
+        return thisrow
+
     def timeseriesToCsv(self,filename,
                         addVarianceColumns=True,
                         singleWells=False,
                         columns=None,
                         fullId=False,
                         progressCall=None,
+                        executor=None,
                         **csvkwargs):
         """
         Write a "comma seperated values" (csv) file of time series for all replicate groups.
@@ -1459,11 +2379,14 @@ class Plate(object):
         :type fullId: bool
         :param progressCall: Function that will be called on each iteration.
         :type progressCall: @fun(int)
+        :param executor: Executor calculating the time series (see :py:mod:`platereader.executor`).
+        :type executor: SerialExecutor or str
         :param csvkwargs: Parameters which are passed on to the csv module; defaults to { 'dialect': 'excel' }
         :type csvkwargs: dict()
         """
         if 'dialect' not in csvkwargs:
             csvkwargs['dialect']='excel'
+        executor=getExecutor(executor)
         col2collabel={
             'od': 'OD',
             'od_var': 'var(OD)',
@@ -1484,6 +2407,8 @@ class Plate(object):
             replicates=self.nonBackgroundWells()
         else:
             replicates=self.nonBackgroundReplicates()
+        # time series of each replicate, in the order of columns
+        allseries=executor.map(_timeseriesCsvWorker,range(len(replicates)),context=(replicates,columns))
 
         with CsvFileUnicodeWriter(filename,**csvkwargs) as sliwriter:
             # header
@@ -1510,25 +2435,12 @@ class Plate(object):
                     progressCall(allcnt)
                 thisrow=[]
                 thisrow.append(self.time[ti])
-                for tc in replicates:
-                    for col in columns:
-                        if col == 'od':
-                            if tc.od() is not None:
-                                thisrow.append(tc.od()[ti])
-                            else:
-                                thisrow.append(None)
-                        elif col == 'od_var':
-                            if tc.odVar() is not None:
-                                thisrow.append(tc.odVar()[ti])
-                            else:
-                                thisrow.append(None)
-                        elif col == 'lnod':
-                            if tc.logOd() is not None:
-                                thisrow.append(tc.logOd()[ti])
-                            else:
-                                thisrow.append(None)
+                for series in allseries:
+                    for ser in series:
+                        if ser is not None:
+                            thisrow.append(ser[ti])
                         else:
-                            raise RuntimeError('unknown property '+col)
+                            thisrow.append(None)
                 sliwriter.writerow(thisrow)
 
     @staticmethod
@@ -1763,3 +2675,146 @@ class Plate(object):
             if self.filename is not None:
                 message += ' in file '+str(self.filename)
             return message
+
+
+# tasks run by an executor (module level, so they can be pickled)
+
+class _LazyReplicates(object):
+    """
+    The wells or replicate groups of a deserialised plate, a Replicate object is created when it is accessed first.
+
+    For internal use only.
+
+    Supports the parts of the list interface used for Plate.wells
+    and Plate.replicateGroups (len, indexing, iteration, +, append).
+    """
+
+    def __init__(self,plate,descriptors,isReplicateGroup):
+        """
+        :param plate: The plate.
+        :type plate: Plate
+        :param descriptors: Serialisations of the replicates (see :py:meth:`Replicate._serialise <.Replicate._serialise>`).
+        :type descriptors: list(dict)
+        :param isReplicateGroup: Whether these are replicate groups.
+        :type isReplicateGroup: bool
+        """
+        self.plate=plate
+        self.descriptors=descriptors
+        self.isReplicateGroup=isReplicateGroup
+        self.objects=[None]*len(descriptors)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __getitem__(self,idx):
+        if isinstance(idx,slice):
+            return [self[i] for i in range(*idx.indices(len(self.objects)))]
+        if idx < 0:
+            idx+=len(self.objects)
+        if idx < 0 or idx >= len(self.objects):
+            raise IndexError('replicate index out of range')
+        tc=self.objects[idx]
+        if tc is None:
+            tc=self.plate._createReplicate(self,idx)
+        return tc
+
+    def __iter__(self):
+        for idx in range(len(self.objects)):
+            yield self[idx]
+
+    def __add__(self,other):
+        return list(self)+list(other)
+
+    def __radd__(self,other):
+        return list(other)+list(self)
+
+    def append(self,tc):
+        self.descriptors.append(None)
+        self.objects.append(tc)
+
+    def created(self):
+        """
+        :return: list(Replicate) -- the Replicate objects that were created so far.
+        """
+        return [tc for tc in self.objects if tc is not None]
+
+def _memoisedNbytes(value):
+    """
+    Return the (approximate) memory used by a memoised result.
+
+    For internal use only.
+    """
+    if isinstance(value,numpy.ndarray):
+        return value.nbytes
+    if isinstance(value,(tuple,list)):
+        return 64+sum([_memoisedNbytes(v) for v in value])
+    if isinstance(value,dict):
+        return 64+sum([_memoisedNbytes(v) for v in value.values()])
+    return 64
+
+def _computeAllWorker(plate,wellIndices):
+    """
+    Calculate the growth parameters of the given wells.
+
+    For internal use only.
+
+    :param plate: The plate (or a copy of it).
+    :type plate: Plate
+    :param wellIndices: Indices of the wells.
+    :type wellIndices: list(int)
+
+    :return: list(dict) -- memoised results of each well.
+    """
+    results=[]
+    for wellIdx in wellIndices:
+        tc=plate.wells[wellIdx]
+        _computeAllForWell(tc)
+        memoised={}
+        for key in Plate._computeAllMemoisedKeys:
+            memoised[key]=tc._memoised[key]
+        results.append(memoised)
+    return results
+
+def _computeAllForWell(tc):
+    """
+    Calculate (and memoise) the growth parameters of a well or replicate group.
+
+    For internal use only.
+    """
+    tc.expFitsOd0Mu()
+    tc.maxGrowthrate()
+    tc.maxGrowthrateFromLogOdDerivative()
+    tc._maxGrowthrate('expfit',detailsInMessage=False)
+    tc._maxGrowthrate('nonlogsmoothed',detailsInMessage=False)
+    tc.growthyield()
+    tc.odSlopemaxIntercept()
+
+def _growthParametersCsvWorker(context,replicateIdx):
+    """
+    Return the row of a replicate for :py:meth:`Plate.growthParametersToCsv <.Plate.growthParametersToCsv>`.
+
+    For internal use only.
+    """
+    replicates, columns = context
+    tc=replicates[replicateIdx]
+    return tc.parentPlate._growthParametersCsvRow(tc,columns)
+
+def _timeseriesCsvWorker(context,replicateIdx):
+    """
+    Return the time series of a replicate for :py:meth:`Plate.timeseriesToCsv <.Plate.timeseriesToCsv>`.
+
+    For internal use only.
+    """
+    replicates, columns = context
+    tc=replicates[replicateIdx]
+    series=[]
+    for col in columns:
+        if col == 'od':
+            series.append(tc.od())
+        elif col == 'od_var':
+            series.append(tc.odVar())
+        elif col == 'lnod':
+            series.append(tc.logOd())
+        else:
+            raise RuntimeError('unknown property '+col)
+    return series
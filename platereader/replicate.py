@@ -28,10 +28,12 @@ Growth Analysis Tool for High-throughput Optical Density Experiments
 import warnings
 import math
 import numpy
-import scipy.stats
 from scipy.interpolate import UnivariateSpline
 
-from platereader.numpytools import maskedArrayToMeanVar, notNanAndGreaterEqual, notNanAndLess
+from platereader.numpytools import nanMeanVar, notNanAndGreaterEqual, notNanAndLess
+from platereader.numpytools import rollingMeanVar, rollingLinregress
+from platereader.expfit import slidingWindowExpFit
+from platereader.executor import warningsLock
 from platereader.statusmessage import StatusMessage, Severity
 
 class Replicate(object):
@@ -50,104 +52,50 @@ class Replicate(object):
         'logOdCutoff': True,
         }
 
-    # for an explanation of this dict see _clearMemoised and _parametersUpdated
-    _memoisedDontClear={
-        'allowGrowthyieldSlopeNStderrAwayFromZero': set(['derivative',
-                                                         'expFitsMu',
-                                                         'expFitsOd0Mu',
-                                                         'logOd',
-                                                         'logOdSmoothed',
-                                                         'od',
-                                                         'odVar',
-                                                         'rawOd',
-                                                         'rawOdVar',
-                                                         'smoothedOd',
-                                                         'smoothedOdDerivative']),
-        'allowMaxGrowthrateAtLowerCutoff': set(['derivative',
-                                                'expFitsMu',
-                                                'expFitsOd0Mu',
-                                                'logOd',
-                                                'logOdSmoothed',
-                                                'od',
-                                                'odVar',
-                                                'rawOd',
-                                                'rawOdVar',
-                                                'smoothedOd',
-                                                'smoothedOdDerivative']),
-        'backgroundIndex': set(['rawOd', 'rawOdVar']),
-        'hdCorrectionCubic': set(['rawOd', 'rawOdVar']),
-        'hdCorrectionLinear': set(['rawOd', 'rawOdVar']),
-        'hdCorrectionQuadratic': set(['rawOd', 'rawOdVar']),
-        'lagAtLogOdEquals': set(['derivative',
-                                 'expFitsMu',
-                                 'expFitsOd0Mu',
-                                 'logOd',
-                                 'logOdSmoothed',
-                                 'od',
-                                 'odVar',
-                                 'rawOd',
-                                 'rawOdVar',
-                                 'smoothedOd',
-                                 'smoothedOdDerivative']),
-        'logOdCutoff': set(['derivative',
-                            'expFitsMu',
-                            'expFitsOd0Mu',
-                            'logOd',
-                            'logOdSmoothed',
-                            'od',
-                            'odVar',
-                            'rawOd',
-                            'rawOdVar',
-                            'smoothedOd',
-                            'smoothedOdDerivative']),
-        'maxGrowthLowerTimeCutoff': set(['derivative',
-                                         'expFitsMu',
-                                         'expFitsOd0Mu',
-                                         'logOd',
-                                         'logOdSmoothed',
-                                         'od',
-                                         'odVar',
-                                         'rawOd',
-                                         'rawOdVar',
-                                         'smoothedOd',
-                                         'smoothedOdDerivative']),
-        'maxGrowthUpperTimeCutoff': set(['derivative',
-                                         'expFitsMu',
-                                         'expFitsOd0Mu',
-                                         'logOd',
-                                         'logOdSmoothed',
-                                         'od',
-                                         'odVar',
-                                         'rawOd',
-                                         'rawOdVar',
-                                         'smoothedOd',
-                                         'smoothedOdDerivative']),
-        'slidingWindowSize': set(['derivative',
-                                  'logOd',
-                                  'logOdSmoothed',
-                                  'od',
-                                  'odVar',
-                                  'rawOd',
-                                  'rawOdVar',
-                                  'smoothedOd',
-                                  'smoothedOdDerivative']),
-        'smoothingK': set(['derivative',
-                           'expFitsMu',
-                           'expFitsOd0Mu',
-                           'logOd',
-                           'od',
-                           'odVar',
-                           'rawOd',
-                           'rawOdVar']),
-        'smoothingS': set(['derivative',
-                           'expFitsMu',
-                           'expFitsOd0Mu',
-                           'logOd',
-                           'od',
-                           'odVar',
-                           'rawOd',
-                           'rawOdVar'])
+    # Memoised ("cached") results and what they are calculated from:
+    # parameters (also 'activewells', 'backgroundIndex', 'backgroundRawOd'
+    # and the plate's 'smoother') or other memoised results. For
+    # replicate groups the results of the child wells are not listed,
+    # those are cleared by _parametersUpdated. See _clearMemoised.
+    _maxGrowthrateParameters=['logOdCutoff','maxGrowthLowerTimeCutoff','maxGrowthUpperTimeCutoff',
+                              'allowMaxGrowthrateAtLowerCutoff','lagAtLogOdEquals']
+    _memoisedDependencies={
+        'rawOd': ['activewells'],
+        'rawOdVar': ['activewells'],
+        'od': ['rawOd','rawOdVar','backgroundIndex','backgroundRawOd',
+               'hdCorrectionLinear','hdCorrectionQuadratic','hdCorrectionCubic'],
+        'odVar': ['od'],
+        'derivative': ['od'],
+        'logOd': ['od'],
+        'smoothedOd': ['od','smoothingK','smoothingS','smoother'],
+        'smoothedOdDerivative': ['smoothedOd'],
+        'logOdSmoothed': ['logOd','smoothingK','smoothingS','smoother'],
+        'logOdDerivative': ['logOd'],
+        'logOdDerivativeFromNonLog': ['od','derivative'],
+        'logOdDerivativeFromNonLogSmoothed': ['smoothedOd','smoothedOdDerivative'],
+        'expFitsOd0Mu': ['od','slidingWindowSize'],
+        'expFitsMu': ['od','slidingWindowSize'],
+        '_maxGrowthrate_expfit': ['expFitsOd0Mu','logOd','slidingWindowSize']+_maxGrowthrateParameters,
+        '_maxGrowthrate_expfit_nodetails': ['expFitsOd0Mu','logOd','slidingWindowSize']+_maxGrowthrateParameters,
+        '_maxGrowthrate_nonlogsmoothed': ['logOdDerivativeFromNonLogSmoothed','smoothedOd','logOd']+_maxGrowthrateParameters,
+        '_maxGrowthrate_nonlogsmoothed_nodetails': ['logOdDerivativeFromNonLogSmoothed','smoothedOd','logOd']+_maxGrowthrateParameters,
+        'odSlopemaxIntercept': ['smoothedOd','smoothedOdDerivative','logOd','logOdCutoff','maxGrowthLowerTimeCutoff'],
+        '_growthyield': ['od','odSlopemaxIntercept','slidingWindowSize','allowGrowthyieldSlopeNStderrAwayFromZero'],
+        '_growthyield_smoothed': ['od','smoothedOd','odSlopemaxIntercept','slidingWindowSize',
+                                  'allowGrowthyieldSlopeNStderrAwayFromZero'],
         }
+    # parameter/memoised result -> memoised results that (indirectly) depend on it, see _memoisedDependingOn
+    _memoisedDependents=None
+    # memoised result -> parameters it is (indirectly) calculated from, see _memoisedSignature
+    _memoisedParameters=None
+    # parameters that can be set explicitly for a replicate, see _setExplicitParameter
+    _inheritableParameterNames=['maxGrowthLowerTimeCutoff','maxGrowthUpperTimeCutoff',
+                                'allowMaxGrowthrateAtLowerCutoff','allowGrowthyieldSlopeNStderrAwayFromZero']
+
+    # plates can hold thousands of replicates, so do not give each of them an attribute dictionary
+    __slots__=('sampleid','condition','wellids','_inheritableParameters','_wellIndices','_activeWellIndices',
+               '_backgroundIndex','_memoised','parentPlate','_replicateGroupParent','_isReplicateGroup',
+               'background','_tmp_backgroundIndex','_resolvedParameters','_resolvedParametersGeneration')
 
     def __init__(self,parentPlate=None,wellIndices=None,sampleid=None,condition=None,wellids=None,
                  activeWellIndices=None,isReplicateGroup=False,
@@ -182,26 +130,21 @@ class Replicate(object):
         self.sampleid=None
         self.condition=None
         self.wellids=None
-        self._inheritableParameters={}
-        self._inheritableParameters['maxGrowthLowerTimeCutoff']=None
-        self._inheritableParameters['maxGrowthUpperTimeCutoff']=None
-        self._inheritableParameters['allowMaxGrowthrateAtLowerCutoff']=None
-        self._inheritableParameters['allowGrowthyieldSlopeNStderrAwayFromZero']=None
+        self._inheritableParameters=None # explicitly set parameters, None if no parameter is set
         self._wellIndices=None
         self._activeWellIndices=None
         self._backgroundIndex=None
-        self._memoised={}
-        self.time=None         # timepoints (numpy array, a reference to the parentPlate for quick access)
-        self.timeunit=None     # the unit of the time (s, h, ...)
+        self._memoised=_MemoisedResults(self)
         self.parentPlate=None
         self._replicateGroupParent=None # if and only if this replicate is part of a replicate group _replicateGroupParent is not None
         self._isReplicateGroup=isReplicateGroup # whether this is a replicate group; NOTE checking _replicateGroupParent is not enough
         self.background=None   # background (Replicate object)
+        self._tmp_backgroundIndex=None
+        self._resolvedParameters=None
+        self._resolvedParametersGeneration=None
         if _unpickled is not None:
             self._deserialise(_unpickled,parentPlate,_serialiseFormat,isReplicateGroup)
         else:
-            self.time=parentPlate.time         # timepoints (numpy array, a reference to the parentPlate for quick access)
-            self.timeunit=parentPlate.timeunit # the unit of the time (s, h, ...)
             self.parentPlate=parentPlate
             self._setCondition(condition)
             self._setWellIds(wellids)
@@ -212,14 +155,12 @@ class Replicate(object):
         if serialiseFormat is None:
             raise RuntimeError("no serialisation format (version) defined")
 
-        self.time=parent.time
-        self.timeunit=parent.timeunit
         self.parentPlate=parent
         self.sampleid=unpickled['sampleId']
         self.condition=unpickled['condition']
-        for par in ['maxGrowthLowerTimeCutoff','maxGrowthUpperTimeCutoff',
-                    'allowMaxGrowthrateAtLowerCutoff', 'allowGrowthyieldSlopeNStderrAwayFromZero']:
-            self._inheritableParameters[par]=unpickled[par]
+        for par in Replicate._inheritableParameterNames:
+            if unpickled[par] is not None:
+                self._setInheritableParameter(par,unpickled[par])
         self._setWellIds(unpickled['wellIds'])
         self._setWellIndices(unpickled['wellIndices'],unpickled['activeWellIndices'])
         self._tmp_backgroundIndex=unpickled['backgroundIndex']
@@ -236,16 +177,38 @@ class Replicate(object):
         return dict(
             sampleId=self.sampleid,
             condition=self.condition,
-            maxGrowthLowerTimeCutoff=self._inheritableParameters['maxGrowthLowerTimeCutoff'],
-            maxGrowthUpperTimeCutoff=self._inheritableParameters['maxGrowthUpperTimeCutoff'],
-            allowMaxGrowthrateAtLowerCutoff=self._inheritableParameters['allowMaxGrowthrateAtLowerCutoff'],
-            allowGrowthyieldSlopeNStderrAwayFromZero=self._inheritableParameters['allowGrowthyieldSlopeNStderrAwayFromZero'],
+            maxGrowthLowerTimeCutoff=self._getInheritableParameter('maxGrowthLowerTimeCutoff'),
+            maxGrowthUpperTimeCutoff=self._getInheritableParameter('maxGrowthUpperTimeCutoff'),
+            allowMaxGrowthrateAtLowerCutoff=self._getInheritableParameter('allowMaxGrowthrateAtLowerCutoff'),
+            allowGrowthyieldSlopeNStderrAwayFromZero=self._getInheritableParameter('allowGrowthyieldSlopeNStderrAwayFromZero'),
             wellIds=self.wellids,
             wellIndices=self._wellIndices,
             activeWellIndices=self._activeWellIndices,
             backgroundIndex=self._backgroundIndex,
             )
 
+    def __getstate__(self):
+        # objects with __slots__ but without __dict__ need this for pickle protocols < 2
+        return dict((slot, getattr(self,slot)) for slot in Replicate.__slots__)
+
+    def __setstate__(self,state):
+        for slot in state:
+            setattr(self,slot,state[slot])
+
+    @property
+    def time(self):
+        """
+        The timepoints (numpy array, a reference to the parentPlate's).
+        """
+        return self.parentPlate.time if self.parentPlate is not None else None
+
+    @property
+    def timeunit(self):
+        """
+        The unit of the time (s, h, ...).
+        """
+        return self.parentPlate.timeunit if self.parentPlate is not None else None
+
     def _invalidate(self):
         """
         Invalidate well. The well is not usable anymore afterwards.
@@ -255,6 +218,8 @@ class Replicate(object):
 
         For internal use only.
         """
+        if self.parentPlate is not None:
+            self.parentPlate._discardPreviousMemoised(self)
         self._memoised={}
         self.sampleid=None
         self.condition=None
@@ -364,6 +329,7 @@ class Replicate(object):
         :type replicateGroupParent: Replicate
         """
         self._replicateGroupParent=replicateGroupParent
+        self.parentPlate._parameterGeneration+=1
 
     def replicateGroupParent(self):
         """
@@ -455,19 +421,18 @@ class Replicate(object):
         self._memoised['rawOd']=None
         self._memoised['rawOdVar']=None
         self._checkActiveWellIndices(self.activeChildWellIndices())
-        if len(self.activeChildWellIndices()) > 0:
-            mat=numpy.zeros([len(self.activeChildWellIndices()),len(self.parentPlate._rawOd[0])])
-            ridx=0
-            for localdataidx in self.activeChildWellIndices():
-                # set row of the matrix
-                mat[ridx,]=self.parentPlate._rawOd[self.childWellIndices()[localdataidx]]
-                ridx+=1
-            # calculate mean of the rawOd for the active data indices
-            self._memoised['rawOd'] = mat.mean(axis=0)
-
-        if len(self.activeChildWellIndices()) > 1:
-            # calculate variance of the rawOd for the active data indices
-            self._memoised['rawOdVar'] = mat.var(axis=0,ddof=1)
+        if len(self.activeChildWellIndices()) == 1:
+            # a single well: read-only view of the plate's row (no copy)
+            row=self.parentPlate._rawOd[self.childWellIndices()[self.activeChildWellIndices()[0]]]
+            row.flags.writeable=False
+            self._memoised['rawOd'] = row
+        elif len(self.activeChildWellIndices()) > 1:
+            # rows of the active data indices (one fancy-indexed copy)
+            globalIndices=numpy.array(self.childWellIndices())[self.activeChildWellIndices()]
+            mat=self.parentPlate._rawOd[globalIndices]
+            # calculate mean and variance of the rawOd for the active data indices
+            self._memoised['rawOd'] = mat.mean(axis=0,dtype=float)
+            self._memoised['rawOdVar'] = mat.var(axis=0,ddof=1,dtype=float)
 
     def setActiveChildWellIndices(self,activeWellIndices):
         """
@@ -603,22 +568,146 @@ class Replicate(object):
 
         For internal use only.
 
-        :param par: The name of the parameter that was changed.
+        :param par: The name of the parameter that was changed (or a list of names).
         :type par: str
 
         See :py:meth:`_parametersUpdated
         <.Plate._parametersUpdated>` for more
         information.
         """
+        dependents=Replicate._memoisedDependingOn(par)
         # if no parameter was given or parameter is not listed, play
         # it safe here and clear all memoised results
-        if par is None or par not in Replicate._memoisedDontClear:
+        if dependents is None:
             self._memoised.clear()
+            self.parentPlate._discardPreviousMemoised(self)
             return
-        # clear all values from memoised results except those that are explicitely excluded
-        for key in list(self._memoised.keys()):
-            if key not in Replicate._memoisedDontClear[par]:
-                self._memoised.pop(key)
+        # clear only the results calculated from par; they are kept
+        # as previous versions in case par is changed back
+        for key in dependents:
+            if dict.__contains__(self._memoised,key):
+                signature=self._memoised.signatures.get(key)
+                value=self._memoised.pop(key)
+                if signature is not None:
+                    self.parentPlate._keepPreviousMemoised(self,key,signature,value)
+
+    @staticmethod
+    def _memoisedDependingOn(par):
+        """
+        Return the memoised results that have to be recalculated when the given parameter changes.
+
+        For internal use only.
+
+        :param par: The name of the parameter (or a list of names).
+        :type par: str
+
+        :return: set(str) -- Keys of memoised results, None if par is not known (i.e. all results).
+
+        The transitive closure of :py:attr:`_memoisedDependencies` is
+        calculated on first use.
+        """
+        if isinstance(par,list):
+            if not len(par):
+                return set()
+            # the union is remembered, it is needed for each replicate
+            key=tuple(par)
+            if Replicate._memoisedDependents is None or key not in Replicate._memoisedDependents:
+                dependents=set()
+                for p in par:
+                    pdependents=Replicate._memoisedDependingOn(p)
+                    if pdependents is None:
+                        dependents=None
+                        break
+                    dependents|=pdependents
+                Replicate._memoisedDependents[key]=dependents
+            return Replicate._memoisedDependents[key]
+        if Replicate._memoisedDependents is None:
+            direct={}
+            for key in Replicate._memoisedDependencies:
+                for inp in Replicate._memoisedDependencies[key]:
+                    direct.setdefault(inp,set()).add(key)
+            dependents={}
+            for inp in direct:
+                todo=list(direct[inp])
+                dependents[inp]=set()
+                while len(todo):
+                    key=todo.pop()
+                    if key not in dependents[inp]:
+                        dependents[inp].add(key)
+                        todo.extend(direct.get(key,[]))
+            Replicate._memoisedDependents=dependents
+        if par is None or par not in Replicate._memoisedDependents:
+            return None
+        return Replicate._memoisedDependents[par]
+
+    def _memoisedSignature(self,key):
+        """
+        Return the values of the parameters the memoised result is calculated from.
+
+        For internal use only.
+
+        :param key: Key of the memoised result.
+        :type key: str
+
+        :return: tuple -- current values of the parameters, None if key is not listed in :py:attr:`_memoisedDependencies`.
+
+        Two results with the same key and signature are the same, this
+        is used to restore previous versions of results (see
+        :py:meth:`Plate._keepPreviousMemoised <.Plate._keepPreviousMemoised>`).
+        For replicate groups the explicit parameters of the active
+        child wells are part of the signature.
+        """
+        if Replicate._memoisedParameters is None:
+            # parameters are the inputs that are not memoised results themselves
+            parameters={}
+            for key0 in Replicate._memoisedDependencies:
+                todo=list(Replicate._memoisedDependencies[key0])
+                seen=set()
+                while len(todo):
+                    inp=todo.pop()
+                    if inp not in seen:
+                        seen.add(inp)
+                        todo.extend(Replicate._memoisedDependencies.get(inp,[]))
+                parameters[key0]=sorted([inp for inp in seen if inp not in Replicate._memoisedDependencies])
+            Replicate._memoisedParameters=parameters
+        if key not in Replicate._memoisedParameters:
+            return None
+        signature=[]
+        resolved=self.resolvedParameters()
+        for par in Replicate._memoisedParameters[key]:
+            if par == 'activewells':
+                signature.append(tuple(self.activeChildWellIndices()))
+            elif par == 'backgroundIndex':
+                signature.append(self._backgroundIndex)
+            elif par == 'backgroundRawOd':
+                signature.append(tuple(self.background.activeChildWellIndices()) if self.background is not None else None)
+            elif par == 'smoother':
+                signature.append(self.parentPlate.smoother())
+            elif self.isReplicateGroup() and not Replicate._isPurePlateParameter.get(par,False):
+                signature.append((resolved[par],)+tuple([tc.resolvedParameters()[par] for tc in self.activeChildWells()]))
+            else:
+                signature.append(resolved[par])
+        return tuple(signature)
+
+    def _restorePreviousMemoised(self,key):
+        """
+        Restore a previous version of a memoised result calculated with the current parameters.
+
+        For internal use only.
+
+        :param key: Key of the memoised result.
+        :type key: str
+
+        :return: bool -- True if a previous version was restored.
+        """
+        if self.parentPlate is None or not self.parentPlate._hasPreviousMemoised(self,key):
+            return False
+        signature=self._memoisedSignature(key)
+        found, value = self.parentPlate._takePreviousMemoised(self,key,signature)
+        if found:
+            self._memoised.signatures[key]=signature
+            self._memoised[key]=value
+        return found
 
     def _parametersUpdated(self,par=None,dontRecurse=False):
         """
@@ -626,7 +715,7 @@ class Replicate(object):
 
         For internal use only.
 
-        :param par: The name of the parameter that was changed.
+        :param par: The name of the parameter that was changed (or a list of names).
         :type par: str
 
         The object memoises some results that are expensive to
@@ -635,7 +724,8 @@ class Replicate(object):
         If par is given, this method can decide which results
         should be removed.
         """
-        if self.isReplicateGroup() and not dontRecurse:
+        # (the child wells do not depend on which of them are active)
+        if self.isReplicateGroup() and not dontRecurse and par != 'activewells':
             for tc in self.childWells():
                 tc._clearMemoised(par)
         self._clearMemoised(par)
@@ -646,6 +736,10 @@ class Replicate(object):
         # depend on any other parameter (only rawOd of background wells is used))
         if par is not None and par == 'activewells' and not dontRecurse:
             self.parentPlate._replicateChanged(self)
+        # plate-wide matrices are made of the wells' results, which do
+        # not depend on the active wells of a replicate group
+        if not (par == 'activewells' and self.isReplicateGroup()):
+            self.parentPlate._clearMemoised(par)
         self.parentPlate.modified=True
 
     def _setExplicitParameter(self,par,val):
@@ -660,11 +754,42 @@ class Replicate(object):
         """
         if par in Replicate._isPurePlateParameter and Replicate._isPurePlateParameter[par]:
             raise RuntimeError("_setExplicitParameter: parameter "+par+" cannot be set as this is a plate-wide parameter")
-        if par not in self._inheritableParameters:
+        if par not in Replicate._inheritableParameterNames:
             raise RuntimeError("_setExplicitParameter: unknown parameter "+par)
-        self._inheritableParameters[par]=val
+        self._setInheritableParameter(par,val)
         self._parametersUpdated(par)
 
+    def _setInheritableParameter(self,par,val):
+        """
+        Store the explicit value of a parameter.
+
+        For internal use only.
+
+        Most replicates do not have any parameter explicitly set, so
+        the dictionary is only allocated when the first one is set
+        and released when the last one is unset.
+        """
+        self.parentPlate._parameterGeneration+=1
+        if val is None:
+            if self._inheritableParameters is not None:
+                self._inheritableParameters.pop(par,None)
+                if not len(self._inheritableParameters):
+                    self._inheritableParameters=None
+            return
+        if self._inheritableParameters is None:
+            self._inheritableParameters={}
+        self._inheritableParameters[par]=val
+
+    def _getInheritableParameter(self,par):
+        """
+        Return the explicit value of a parameter, None if it is not set.
+
+        For internal use only.
+        """
+        if self._inheritableParameters is None:
+            return None
+        return self._inheritableParameters.get(par)
+
     def _getExplicitParameter(self,par):
         """
         Get explicit value of parameter (inherited value is not considered).
@@ -676,9 +801,9 @@ class Replicate(object):
         """
         if par in Replicate._isPurePlateParameter and Replicate._isPurePlateParameter[par]:
             return None
-        if par not in self._inheritableParameters:
+        if par not in Replicate._inheritableParameterNames:
             raise RuntimeError("_getExplicitParameter: unknown parameter "+par)
-        return self._inheritableParameters[par]
+        return self._getInheritableParameter(par)
 
     def getParameter(self,par):
         """
@@ -695,19 +820,39 @@ class Replicate(object):
         See chapter :ref:`parameters <gat parameters>` for details of
         parameter handling and available parameters.
         """
-        if par in Replicate._isPurePlateParameter and Replicate._isPurePlateParameter[par]:
-            # this is a plate parameter (global parameter), get it from plate object
-            return self.parentPlate._getDefaultParameter(par)
-        if par not in self._inheritableParameters:
+        resolved=self.resolvedParameters()
+        if par not in resolved:
             raise RuntimeError("getParameter: unknown parameter "+par)
-        if self._inheritableParameters[par] is not None:
-            # parameter is explicitly set
-            return self._inheritableParameters[par]
-        if self.replicateGroupParent() is not None and self.replicateGroupParent().getParameter(par) is not None:
-            # take parameter from parental replicate group
-            return self.replicateGroupParent().getParameter(par)
-        # neither explicitly set nor implicitely via parental replicate group: use plate default
-        return self.parentPlate._getDefaultParameter(par)
+        return resolved[par]
+
+    def resolvedParameters(self):
+        """
+        Return the values of all parameters.
+
+        :return: dict(str -> value) -- the value of each parameter as returned by :py:meth:`getParameter`.
+
+        The values are resolved once and remembered until a parameter
+        of the plate or of any replicate changes. Computations that
+        need several parameters can use this instead of repeatedly
+        calling :py:meth:`getParameter`. The dictionary is shared
+        (e.g. by wells that do not override parameters of their
+        replicate group), it must not be modified.
+        """
+        if self._resolvedParametersGeneration == self.parentPlate._parameterGeneration:
+            return self._resolvedParameters
+        if self.replicateGroupParent() is not None:
+            # take parameters from parental replicate group
+            resolved=self.replicateGroupParent().resolvedParameters()
+        else:
+            # plate defaults and plate parameters
+            resolved=self.parentPlate._getResolvedParameters()
+        if self._inheritableParameters is not None:
+            # parameters explicitly set for this replicate
+            resolved=dict(resolved)
+            resolved.update(self._inheritableParameters)
+        self._resolvedParameters=resolved
+        self._resolvedParametersGeneration=self.parentPlate._parameterGeneration
+        return resolved
 
     def parameterIsEditible(self,par):
         """
@@ -723,7 +868,7 @@ class Replicate(object):
         """
         if par in Replicate._isPurePlateParameter and Replicate._isPurePlateParameter[par]:
             return False
-        if par not in self._inheritableParameters:
+        if par not in Replicate._inheritableParameterNames:
             raise RuntimeError("parameterIsEditible: unknown parameter "+par)
 
         return True
@@ -948,8 +1093,27 @@ class Replicate(object):
         if self.od() is None:
             return None
 
-        self._memoised['smoothedOd']=None
-        with warnings.catch_warnings(record=True) as w:
+        if self.parentPlate.smoother() == 'batched':
+            if not self.isReplicateGroup():
+                # all wells are smoothed at once
+                self.parentPlate.smoothedOdMatrix()
+            if 'smoothedOd' not in self._memoised:
+                self.parentPlate._smoothBatched([self],'smoothedOd')
+            return self._memoised['smoothedOd']
+
+        self._memoised['smoothedOd']=self._smoothedOdUnivariateSpline()
+        return self._memoised['smoothedOd']
+
+    def _smoothedOdUnivariateSpline(self):
+        """
+        Return smoothing spline of optical density (scipy.interpolate.UnivariateSpline of this replicate).
+
+        For internal use only.
+
+        :return: numpy.array(float) -- Smoothed optical density.
+        """
+        smoothedOd=None
+        with warningsLock, warnings.catch_warnings(record=True) as w:
             # Cause all warnings to always be triggered.
             warnings.simplefilter("always")
 
@@ -957,9 +1121,9 @@ class Replicate(object):
             if len(w):
                 print("smoothing for sample '"+self.sampleid+"' condition '"+self.condition+"' failed")
             else:
-                self._memoised['smoothedOd']=f(self.time)
+                smoothedOd=f(self.time)
 
-        return self._memoised['smoothedOd']
+        return smoothedOd
 
     def smoothedOdDerivative(self):
         """
@@ -1003,9 +1167,28 @@ class Replicate(object):
         if 'logOdSmoothed' in self._memoised:
             return self._memoised['logOdSmoothed']
 
-        self._memoised['logOdSmoothed']=None
+        if self.parentPlate.smoother() == 'batched' and self.logOd() is not None:
+            if not self.isReplicateGroup():
+                # all wells are smoothed at once
+                self.parentPlate.logOdSmoothedMatrix()
+            if 'logOdSmoothed' not in self._memoised:
+                self.parentPlate._smoothBatched([self],'logOdSmoothed')
+            return self._memoised['logOdSmoothed']
+
+        self._memoised['logOdSmoothed']=self._logOdSmoothedUnivariateSpline()
+        return self._memoised['logOdSmoothed']
+
+    def _logOdSmoothedUnivariateSpline(self):
+        """
+        Return smoothed logarithm optical density (scipy.interpolate.UnivariateSpline of this replicate).
+
+        For internal use only.
+
+        :return: numpy.array(float) -- Smoothed log(OD).
+        """
+        logOdSmoothed=None
         try:
-            with warnings.catch_warnings(record=True) as w:
+            with warningsLock, warnings.catch_warnings(record=True) as w:
                 # Cause all warnings to always be triggered.
                 warnings.simplefilter("always")
 
@@ -1016,11 +1199,11 @@ class Replicate(object):
                 if len(w):
                     print("logsmoothing for sample '"+self.fullId()+"' failed (warning)")
                 else:
-                    self._memoised['logOdSmoothed']=f(self.time)
+                    logOdSmoothed=f(self.time)
         except :
             print("logsmoothing for sample '"+self.fullId()+"' failed (error)")
 
-        return self._memoised['logOdSmoothed']
+        return logOdSmoothed
 
     def logOdDerivative(self):
         """
@@ -1028,9 +1211,14 @@ class Replicate(object):
 
         :return: numpy.array(float) -- Derivative of logarithmised optical density.
         """
-        if self.od() is None:
-            return None
-        return numpy.diff(self.logOd())/numpy.diff(self.time)
+        if 'logOdDerivative' in self._memoised:
+            return self._memoised['logOdDerivative']
+
+        self._memoised['logOdDerivative']=None
+        if self.od() is not None:
+            self._memoised['logOdDerivative']=numpy.diff(self.logOd())/numpy.diff(self.time)
+
+        return self._memoised['logOdDerivative']
 
     def logOdDerivativeFromNonLog(self):
         """
@@ -1038,6 +1226,10 @@ class Replicate(object):
 
         :return: numpy.array(float) -- Derivative of logarithmised optical density.
         """
+        if 'logOdDerivativeFromNonLog' in self._memoised:
+            return self._memoised['logOdDerivativeFromNonLog']
+
+        self._memoised['logOdDerivativeFromNonLog']=None
         if self.od() is None:
             return None
 
@@ -1047,7 +1239,8 @@ class Replicate(object):
         logodderivative[nonzeroidcs]=1/od0[nonzeroidcs]*self.derivative()[nonzeroidcs]
         logodderivative[~nonzeroidcs]=numpy.nan
 
-        return logodderivative
+        self._memoised['logOdDerivativeFromNonLog']=logodderivative
+        return self._memoised['logOdDerivativeFromNonLog']
 
     def logOdDerivativeFromNonLogSmoothed(self):
         """
@@ -1055,6 +1248,10 @@ class Replicate(object):
 
         :return: numpy.array(float) -- Derivative of logarithmised optical density.
         """
+        if 'logOdDerivativeFromNonLogSmoothed' in self._memoised:
+            return self._memoised['logOdDerivativeFromNonLogSmoothed']
+
+        self._memoised['logOdDerivativeFromNonLogSmoothed']=None
         if self.smoothedOd() is None:
             return None
 
@@ -1064,7 +1261,8 @@ class Replicate(object):
         logodderivative[nonzeroidcs]=1/od0[nonzeroidcs]*self.smoothedOdDerivative()[nonzeroidcs]
         logodderivative[~nonzeroidcs]=numpy.nan
 
-        return logodderivative
+        self._memoised['logOdDerivativeFromNonLogSmoothed']=logodderivative
+        return self._memoised['logOdDerivativeFromNonLogSmoothed']
 
     def expFitsOd0Mu(self):
         """
@@ -1087,6 +1285,7 @@ class Replicate(object):
         c={}
         c['mu'], c['muvar'], c['od0'], c['od0var'] = self._localODexpFit(fitOd0=True,useSmoothed=False)
         self._memoised['expFitsOd0Mu']=c
+        c=self._memoised['expFitsOd0Mu']
         return c['mu'], c['muvar'], c['od0'], c['od0var']
 
     def expFitsMu(self):
@@ -1107,8 +1306,70 @@ class Replicate(object):
         c={}
         c['mu'], c['muvar'], od0Dummy, od0varDummy = self._localODexpFit(fitOd0=False,useSmoothed=False)
         self._memoised['expFitsMu']=c
+        c=self._memoised['expFitsMu']
         return c['mu'], c['muvar']
 
+    def _slidingWindowSizeForFit(self):
+        """
+        Return the size of the sliding window, making sure it is usable for the exponential fits.
+
+        For internal use only.
+
+        :return: int -- Number of datapoints of sliding windows.
+        """
+        slidingWindowSize=self.slidingWindowSize()
+        if slidingWindowSize is None:
+            raise RuntimeError("slidingWindowSize for "+self.fullId(withPlateId=True)+" is None")
+        if slidingWindowSize < 3:
+            raise RuntimeError("slidingWindowSize for "+self.fullId(withPlateId=True)+" is too small: "+str(slidingWindowSize))
+        return slidingWindowSize
+
+    @staticmethod
+    def _aggregateChildResults(results,idcs=None,ddof=1):
+        """
+        Return means and variances of scalar results of the active child wells.
+
+        :param results: results of the child wells, one row per well and one column per parameter (None/nan if undefined)
+        :type results: numpy.array(float)
+        :param idcs: mask of wells that are left out, defaults to the wells where the first parameter is nan
+        :type idcs: numpy.array(bool)
+        :param ddof: delta degrees of freedom of the variance
+        :type ddof: int
+
+        :return: list(float), list(float) -- mean and variance of each parameter (None where undefined)
+
+        For internal use only.
+        """
+        if idcs is None:
+            idcs=numpy.isnan(results[:,0])
+        means, variances = nanMeanVar(results, idcs[:,numpy.newaxis], ddof=ddof, axis=0)
+        if means is None:
+            return [None]*results.shape[1], [None]*results.shape[1]
+        return ([None if numpy.isnan(m) else m for m in means],
+                [None if numpy.isnan(v) else v for v in variances])
+
+    @staticmethod
+    def _aggregateChildSeries(series,ddof=1):
+        """
+        Return means and variances of time series of the active child wells, ignoring nans.
+
+        :param series: time series of the child wells, of shape (wells, number of series, timepoints)
+        :type series: numpy.array(float)
+        :param ddof: delta degrees of freedom of the variance
+        :type ddof: int
+
+        :return: list(numpy.array(float)), list(numpy.array(float)) -- mean and variance of each series (None if all values are nan)
+
+        For internal use only.
+        """
+        means=[]
+        variances=[]
+        for i in range(series.shape[1]):
+            mean, var = nanMeanVar(series[:,i], ddof=ddof, axis=0)
+            means.append(mean)
+            variances.append(var)
+        return means, variances
+
     def _localODexpFit(self,fitOd0=True,useSmoothed=False):
         """
         Return parameters for fitted exponential functions.
@@ -1119,23 +1380,24 @@ class Replicate(object):
         """
         if self.od() is None:
             return None, None, None, None
-        slidingWindowSize=self.slidingWindowSize()
-        if slidingWindowSize is None:
-            raise RuntimeError("slidingWindowSize for "+self.fullId(withPlateId=True)+" is None")
-        if slidingWindowSize < 3:
-            raise RuntimeError("slidingWindowSize for "+self.fullId(withPlateId=True)+" is too small: "+str(slidingWindowSize))
+        slidingWindowSize=self._slidingWindowSizeForFit()
 
         if self.isReplicateGroup():
-            # here we average over the underlying wells
-            mu=numpy.zeros([len(self.activeChildWellIndices()), len(self.od())-slidingWindowSize])
-            od0=numpy.zeros([len(self.activeChildWellIndices()), len(self.od())-slidingWindowSize])
+            # here we average over the underlying wells, stacked as (wells, [mu, od0], windows)
+            fits=numpy.empty([len(self.activeChildWellIndices()), 2, len(self.od())-slidingWindowSize])
             i=0
             for tc in self.activeChildWells():
-                mu[i], muvarDummy, od0[i], od0varDummy = tc._localODexpFit(fitOd0=fitOd0,useSmoothed=useSmoothed)
+                if fitOd0 is True and useSmoothed is False:
+                    # use (possibly memoised) fits of the children
+                    fits[i,0], muvarDummy, fits[i,1], od0varDummy = tc.expFitsOd0Mu()
+                elif useSmoothed is False:
+                    fits[i,0], muvarDummy = tc.expFitsMu()
+                    fits[i,1]=numpy.nan
+                else:
+                    fits[i,0], muvarDummy, fits[i,1], od0varDummy = tc._localODexpFit(fitOd0=fitOd0,useSmoothed=useSmoothed)
                 i+=1
 
-            mumean, muvar = maskedArrayToMeanVar(mu, ddof=1, axis=0)
-            od0mean, od0var = maskedArrayToMeanVar(od0, ddof=1, axis=0)
+            (mumean, od0mean), (muvar, od0var) = Replicate._aggregateChildSeries(fits, ddof=1)
 
             return mumean, muvar, od0mean, od0var
 
@@ -1146,36 +1408,10 @@ class Replicate(object):
         if thisod is None:
             return None, None, None, None
 
-        mu=numpy.zeros([len(self.od())-slidingWindowSize])
-        od0=numpy.empty([len(self.od())-slidingWindowSize])
-        od0.fill(numpy.nan)
-        for i in range(0,mu.shape[0]):
-            if fitOd0 is True:
-                # function to fit: OD_fit(t[i+j]) = OD_i * exp(mu*(t[i+j] - t[i]))
-                # i.e. OD_i and mu are fit parameters, and a good guess for OD_i is OD_meas(t[i])
-                f = lambda tminti, *p: p[0] * numpy.exp(p[1]*(tminti))
-                try:
-                    popt, pcov = scipy.optimize.curve_fit(f,
-                                                          xdata=self.time[i:i+slidingWindowSize]-self.time[i],
-                                                          ydata=thisod[i:i+slidingWindowSize],
-                                                          p0=[thisod[i],1])
-                    mu[i]=popt[1]
-                    od0[i]=popt[0]
-                except RuntimeError as e:
-                    mu[i]=numpy.nan
-                    od0[i]=numpy.nan
-            else:
-                # function to fit: OD_fit(t[i+j]) = OD[t[i]] * exp(mu*(t[i+j] - t[i]))
-                # i.e. mu is the fit parameter
-                f = lambda tminti, *p: thisod[i] * numpy.exp(p[0]*(tminti))
-                try:
-                    popt, pcov = scipy.optimize.curve_fit(f,
-                                                          xdata=self.time[i:i+slidingWindowSize]-self.time[i],
-                                                          ydata=thisod[i:i+slidingWindowSize],
-                                                          p0=[1])
-                    mu[i]=popt[0]
-                except RuntimeError as e:
-                    mu[i]=numpy.nan
+        # function to fit: OD_fit(t[i+j]) = OD_i * exp(mu*(t[i+j] - t[i]))
+        # i.e. OD_i and mu are fit parameters (or only mu, with OD_i = OD_meas(t[i]))
+        # all windows are fitted at once
+        mu, od0 = slidingWindowExpFit(self.time,thisod,slidingWindowSize,fitOd0=fitOd0)
 
         return mu, None, od0, None
 
@@ -1208,6 +1444,28 @@ class Replicate(object):
 
         FIXME enhance documentation of returned values!
         """
+        key=Replicate._maxGrowthrateMemoisedKey(method,detailsInMessage)
+        if key not in self._memoised:
+            self._memoised[key]=self._calculateMaxGrowthrate(method,detailsInMessage)
+        return self._memoised[key]
+
+    @staticmethod
+    def _maxGrowthrateMemoisedKey(method,detailsInMessage):
+        """
+        Return the key of the memoised result of :py:meth:`_maxGrowthrate <.Replicate._maxGrowthrate>`.
+
+        For internal use only.
+        """
+        return '_maxGrowthrate_'+method+('' if detailsInMessage else '_nodetails')
+
+    def _calculateMaxGrowthrate(self,method,detailsInMessage):
+        """
+        Calculate parameters for exponential function at maximal growth rate.
+
+        For internal use only.
+
+        See :py:meth:`_maxGrowthrate <.Replicate._maxGrowthrate>`.
+        """
         lagAtLogOdEquals=self.lagAtLogOdEquals()
         allowMuMaxAtLowerCutoff=self.allowMaxGrowthrateAtLowerCutoff()
 
@@ -1218,34 +1476,28 @@ class Replicate(object):
         methodtxt=method2statustext[method]
 
         if self.isReplicateGroup():
-            # here we average over the underlying wells
-            mumax=numpy.zeros([len(self.activeChildWellIndices())])
-            od0max=numpy.zeros([len(self.activeChildWellIndices())])
-            maxt=numpy.zeros([len(self.activeChildWellIndices())])
-            lag=numpy.zeros([len(self.activeChildWellIndices())])
+            # here we average over the underlying wells, stacked as (wells, [mumax, od0max, maxt, lag])
+            results=[tc._maxGrowthrate(method,detailsInMessage=False) for tc in self.activeChildWells()]
+            values=numpy.array([result[0:8:2] for result in results],dtype=float).reshape([len(results),4])
+            idcs=numpy.isnan(values[:,0])
+            lagidcs=numpy.isnan(values[:,3])
             allstatuses=StatusMessage()
             statuses=StatusMessage()
             alllagstatuses=StatusMessage()
             lagstatuses=StatusMessage()
-            i=0
-            for tc in self.activeChildWells():
-                mumax[i], d1, od0max[i], d2, maxt[i], d3, lag[i], d4, themethod, status = tc._maxGrowthrate(method,detailsInMessage=False)
+            for i in range(len(results)):
+                status=results[i][9]
                 if status is not None:
                     allstatuses.addStatus(status)
                     alllagstatuses.addStatus(status.statusesWithKey('lag ('+methodtxt+'):'))
-                if status is not None and ~numpy.isnan(mumax[i]):
+                if status is not None and not idcs[i]:
                     statuses.addStatus(status.statusesWithKey('max. growth rate ('+methodtxt+'):'))
-                if status is not None and ~numpy.isnan(lag[i]):
+                if status is not None and not lagidcs[i]:
                     lagstatuses.addStatus(status.statusesWithKey('lag ('+methodtxt+'):'))
-                i+=1
-            idcs=numpy.isnan(mumax)
-            lagidcs=numpy.isnan(lag)
             if numpy.all(idcs):
                 return None, None, None, None, None, None, None, None, method, allstatuses
-            mumaxmean, mumaxvar =   maskedArrayToMeanVar(mumax, idcs, ddof=1)
-            od0maxmean, od0maxvar = maskedArrayToMeanVar(od0max, idcs, ddof=1)
-            maxtmean, maxtvar =     maskedArrayToMeanVar(maxt, idcs, ddof=1)
-            lagmean, lagvar =       maskedArrayToMeanVar(lag, lagidcs, ddof=1)
+            (mumaxmean, od0maxmean, maxtmean), (mumaxvar, od0maxvar, maxtvar) = Replicate._aggregateChildResults(values[:,0:3], idcs, ddof=1)
+            (lagmean,), (lagvar,) = Replicate._aggregateChildResults(values[:,3:4], lagidcs, ddof=1)
 
             if lagmean is None:
                 statuses.addStatus(alllagstatuses)
@@ -1309,7 +1561,7 @@ class Replicate(object):
         # ==> log(od0)=log(od0_t0)-mu*t0
         # ==> od0 = od0_t0 * exp(-mu*t0)
         if method == 'expfit':
-            od0max=od0[idcs][maxidx] * math.exp(-mumax*self.time[idcs][maxidx])
+            od0max=od0[idcs][maxidx] * math.exp(-mumax*self.time[:len(idcs)][idcs][maxidx])
         else:
             od0max=od0[idcs][maxidx] * math.exp(-mumax*t[idcs][maxidx])
 
@@ -1417,35 +1669,37 @@ class Replicate(object):
 
         :return: float, float, float, float, float, float, numpy.array(int), StatusMessage -- mean(slope), var(slope), mean(intercept), var(intercept), mean(timemax), var(timemax), timemaxIdcs, status
         """
+        if 'odSlopemaxIntercept' not in self._memoised:
+            self._memoised['odSlopemaxIntercept']=self._calculateOdSlopemaxIntercept()
+        return self._memoised['odSlopemaxIntercept']
+
+    def _calculateOdSlopemaxIntercept(self):
+        """
+        Calculate maximal slope, intercept, time of maximal slope and time index of the (linear) OD.
+
+        For internal use only.
+
+        See :py:meth:`odSlopemaxIntercept <.Replicate.odSlopemaxIntercept>`.
+        """
 
         if self.isReplicateGroup():
-            # here we average over the underlying wells
-            slopemax=numpy.empty([len(self.activeChildWellIndices())])
-            slopemax.fill(numpy.nan)
-            interceptmax=numpy.empty([len(self.activeChildWellIndices())])
-            interceptmax.fill(numpy.nan)
-            timemax=numpy.empty([len(self.activeChildWellIndices())])
-            timemax.fill(numpy.nan)
-            timemaxIdx=numpy.empty([len(self.activeChildWellIndices())])
-            timemaxIdx.fill(numpy.nan)
+            # here we average over the underlying wells, stacked as (wells, [slopemax, interceptmax, timemax, timemaxIdx])
+            results=[tc.odSlopemaxIntercept() for tc in self.activeChildWells()]
+            values=numpy.array([result[0:6:2]+(result[6][0] if result[6] is not None else None,) for result in results],
+                               dtype=float).reshape([len(results),4])
+            timemaxIdx=values[:,3]
+            idcs=numpy.isnan(values[:,0])
             allstatuses=StatusMessage()
             statuses=StatusMessage()
-            i=0
-            for tc in self.activeChildWells():
-                slopemax[i], slopemaxVarDummy, interceptmax[i], interceptmaxVarDummy, timemax[i], timemaxVarDummy, timemaxIndices, status = tc.odSlopemaxIntercept()
-                if timemaxIndices is not None:
-                    timemaxIdx[i]=timemaxIndices[0]
+            for i in range(len(results)):
+                status=results[i][7]
                 if status is not None:
                     allstatuses.addStatus(status)
-                if status is not None and ~numpy.isnan(slopemax[i]):
+                if status is not None and not idcs[i]:
                     statuses.addStatus(status)
-                i+=1
-            idcs=numpy.isnan(slopemax)
             if numpy.all(idcs):
                 return None, None, None, None, None, None, None, allstatuses
-            slopemaxmean, slopemaxvar =   maskedArrayToMeanVar(slopemax, idcs, ddof=1)
-            interceptmaxmean, interceptmaxvar = maskedArrayToMeanVar(interceptmax, idcs, ddof=1)
-            timemaxmean, timemaxvar =     maskedArrayToMeanVar(timemax, idcs, ddof=1)
+            (slopemaxmean, interceptmaxmean, timemaxmean), (slopemaxvar, interceptmaxvar, timemaxvar) = Replicate._aggregateChildResults(values[:,0:3], idcs, ddof=1)
 
             return slopemaxmean, slopemaxvar, interceptmaxmean, interceptmaxvar, timemaxmean, timemaxvar, timemaxIdx, statuses
 
@@ -1540,12 +1794,8 @@ class Replicate(object):
         else:
             thisod=self.od()
 
-        mean=numpy.zeros([toidx-fromidx])
-        sigma2=numpy.zeros([toidx-fromidx])
-        for i in range(fromidx,toidx):
-            window=thisod[i:i+slidingWindowSize]
-            mean[i-fromidx]=window.mean()
-            sigma2[i-fromidx]=window.var()
+        # all windows starting within [fromidx,toidx[ at once
+        mean, sigma2 = rollingMeanVar(thisod[fromidx:toidx+slidingWindowSize-1],slidingWindowSize)
 
         return mean, sigma2
 
@@ -1572,14 +1822,10 @@ class Replicate(object):
         else:
             thisod=self.od()
 
-        slope = numpy.zeros([toidx-fromidx])
-        slopeStdErr = numpy.zeros([toidx-fromidx])
-        intercept = numpy.zeros([toidx-fromidx])
-        for i in range(fromidx,toidx):
-            window=thisod[i:i+slidingWindowSize]
-            slope[i-fromidx], intercept[i-fromidx], thisr_value, thisp_value, slopeStdErr[i-fromidx] = scipy.stats.linregress(
-                self.time[i:i+slidingWindowSize],
-                window)
+        # all windows starting within [fromidx,toidx[ at once
+        slope, intercept, slopeStdErr = rollingLinregress(self.time[fromidx:toidx+slidingWindowSize-1],
+                                                          thisod[fromidx:toidx+slidingWindowSize-1],
+                                                          slidingWindowSize)
 
         return slope, slopeStdErr, intercept
 
@@ -1602,6 +1848,19 @@ class Replicate(object):
 
         For internal use only.
         """
+        key='_growthyield_smoothed' if useSmoothed else '_growthyield'
+        if key not in self._memoised:
+            self._memoised[key]=self._calculateGrowthyield(useSmoothed)
+        return self._memoised[key]
+
+    def _calculateGrowthyield(self,useSmoothed):
+        """
+        Calculate estimate of the growth yield.
+
+        For internal use only.
+
+        See :py:meth:`_growthyield <.Replicate._growthyield>`.
+        """
 
         if self.od() is None:
             return None, None, None, None, StatusMessage(key='growthyield',shortmsg='growthyield:noOd',
@@ -1609,24 +1868,20 @@ class Replicate(object):
                                                                              severity=Severity.failed)
 
         if self.isReplicateGroup():
-            warnings.simplefilter('error', UserWarning)
-            # here we average over the underlying wells
-            growthyield=numpy.zeros([len(self.activeChildWellIndices())])
-            tgrowthyield=numpy.zeros([len(self.activeChildWellIndices())])
+            # here we average over the underlying wells, stacked as (wells, [growthyield, tgrowthyield])
+            results=[tc._growthyield(useSmoothed) for tc in self.activeChildWells()]
+            values=numpy.array([result[0:4:2] for result in results],dtype=float).reshape([len(results),2])
+            idcs=numpy.isnan(values[:,0])
             allstatuses=StatusMessage()
             statuses=StatusMessage()
-            i=0
-            for tc in self.activeChildWells():
-                growthyield[i], d1, tgrowthyield[i], d2, status = tc._growthyield(useSmoothed)
+            for i in range(len(results)):
+                status=results[i][4]
                 allstatuses.addStatus(status)
-                if status is not None and ~numpy.isnan(growthyield[i]):
+                if status is not None and not idcs[i]:
                     statuses.addStatus(status)
-                i+=1
-            idcs=numpy.isnan(growthyield)
             if numpy.all(idcs):
                 return None, None, None, None, allstatuses
-            (growthyieldmean, growthyieldvar)=maskedArrayToMeanVar(growthyield, idcs, ddof=1)
-            (tgrowthyieldmean, tgrowthyieldvar)=maskedArrayToMeanVar(tgrowthyield, idcs, ddof=1)
+            (growthyieldmean, tgrowthyieldmean), (growthyieldvar, tgrowthyieldvar) = Replicate._aggregateChildResults(values, idcs, ddof=1)
 
             return growthyieldmean, growthyieldvar, tgrowthyieldmean, tgrowthyieldvar, statuses
 
@@ -1677,7 +1932,7 @@ class Replicate(object):
         # pick the largest value of those that are valid
         yieldidx=numpy.argmax(mean[validIndices])
         growthyield=mean[validIndices][yieldidx]
-        tgrowthyield=self.time[tmb+timemaxIdx:][validIndices][yieldidx]
+        tgrowthyield=self.time[tmb+timemaxIdx:][:len(validIndices)][validIndices][yieldidx]
 
         if growthyield<0:
             return None, None, None, None, StatusMessage(key='growthyield',shortmsg='growthyield:negativeYield',
@@ -1707,3 +1962,63 @@ class Replicate(object):
                 # doubvar(mu)= (d{doub(mu)}/d{mu})^2 * muvar = (-ln(2)/mu^2)^2 * muvar = ln(2)^2/mu^4 * muvar
                 doublingtimevar=math.pow(math.log(2),2)/math.pow(mu,4)*mu_var
         return doublingtime, doublingtimevar
+
+class _MemoisedResults(dict):
+    """
+    Memoised results of a Replicate, remembering the parameters they were calculated with.
+
+    For internal use only.
+
+    The signature (see :py:meth:`Replicate._memoisedSignature
+    <.Replicate._memoisedSignature>`) of a result is taken when it is
+    first stored. Checking for a result that is missing ('key in
+    memoised') restores a previous version calculated with the
+    current parameters, if there is one. Results stored within
+    :py:meth:`Plate.batchUpdate <.Plate.batchUpdate>` have no
+    signature.
+    """
+
+    __slots__=('replicate','signatures')
+
+    def __init__(self,replicate):
+        dict.__init__(self)
+        self.replicate=replicate
+        self.signatures={}
+
+    def __setitem__(self,key,value):
+        # replicate is not set yet while unpickling
+        replicate=getattr(self,'replicate',None)
+        if replicate is not None and replicate.parentPlate is not None:
+            value=replicate.parentPlate._storedWithPrecision(value)
+        dict.__setitem__(self,key,value)
+        if replicate is not None and key not in self.signatures:
+            if replicate.parentPlate is not None and replicate.parentPlate._batchUpdateDepth > 0:
+                # may be calculated from results that are cleared when
+                # the batch is finished, so it must not be kept as the
+                # previous version for the new parameters
+                self.signatures[key]=None
+            else:
+                self.signatures[key]=replicate._memoisedSignature(key)
+
+    def __contains__(self,key):
+        if dict.__contains__(self,key):
+            return True
+        if getattr(self,'replicate',None) is None:
+            return False
+        return self.replicate._restorePreviousMemoised(key)
+
+    def pop(self,key,*args):
+        self.signatures.pop(key,None)
+        return dict.pop(self,key,*args)
+
+    def clear(self):
+        self.signatures.clear()
+        dict.clear(self)
+
+    def __reduce__(self):
+        # the replicate is set after the results, see __setitem__
+        return (_MemoisedResults, (None,), {'replicate': self.replicate, 'signatures': self.signatures}, None, iter(self.items()))
+
+    def __setstate__(self,state):
+        self.replicate=state['replicate']
+        self.signatures=state['signatures']
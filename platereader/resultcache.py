@@ -0,0 +1,130 @@
+"""
+This module implements the file format of the result cache of plates.
+
+Growth Analysis Tool for High-throughput Optical Density Experiments
+(GATHODE) result cache.
+
+Results that are expensive to calculate (exponential fits, smoothing
+splines, growth parameters) can be saved to a file beside the plate
+file (see :py:meth:`Plate.saveResultCache
+<.Plate.saveResultCache>`). The file starts with a small header
+holding a digest of the raw data, which is checked when the plate is
+opened; the results themselves are only read when a result is needed.
+
+.. note::
+
+    The results are stored as Python pickles, only load result
+    caches you created yourself.
+"""
+
+# GATHODE  Growth Analysis Tool
+#          for High-throughput Optical Density Experiments
+#
+# Copyright (C) 2014 Nils Christian
+#
+# This file is part of GATHODE.
+#
+# GATHODE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# GATHODE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with GATHODE.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import pickle
+import numpy
+
+from platereader._version import __version__
+
+def resultCacheFilename(filename):
+    """
+    Return the name of the result cache belonging to a plate file.
+
+    :param filename: Name of the plate file.
+    :type filename: str
+
+    :return: str -- name of the result cache file.
+    """
+    return filename+'.cache'
+
+def plateDigest(plate):
+    """
+    Return a digest of the raw data and layout of a plate.
+
+    :param plate: The plate.
+    :type plate: Plate
+
+    :return: str -- hexadecimal digest.
+
+    Parameters are not part of the digest, each cached result
+    records the parameters it was calculated with (see
+    :py:meth:`Replicate._memoisedSignature <.Replicate._memoisedSignature>`).
+    The version of GATHODE is included, so results of a different
+    implementation are not used.
+    """
+    digest=hashlib.sha1()
+    digest.update(__version__.encode('utf-8'))
+    digest.update(numpy.ascontiguousarray(plate.time,dtype=float).tobytes())
+    digest.update(numpy.ascontiguousarray(plate._rawOd,dtype=float).tobytes())
+    layout=[[tc.childWellIndices() for tc in plate.wells],
+            [tc.childWellIndices() for tc in plate.replicateGroups]]
+    digest.update(repr(layout).encode('utf-8'))
+    return digest.hexdigest()
+
+def writeResultCache(filename,digest,entries):
+    """
+    Write a result cache.
+
+    :param filename: Name of the result cache file.
+    :type filename: str
+    :param digest: Digest of the plate (see :py:func:`plateDigest`).
+    :type digest: str
+    :param entries: The results.
+    :type entries: list(tuple(bool, int, str, tuple, value)) -- whether it is a replicate group, index of the replicate, key, signature and value of the memoised result.
+    """
+    header=dict(format='gathoderesultcache',formatversion='1',digest=digest)
+    with open(filename,'wb') as wfile:
+        pickle.dump(header,wfile,protocol=2)
+        pickle.dump(entries,wfile,protocol=2)
+
+def readResultCacheHeader(filename):
+    """
+    Read the header of a result cache.
+
+    :param filename: Name of the result cache file.
+    :type filename: str
+
+    :return: str, int -- digest of the plate and offset of the results, None, None if this is not a result cache.
+    """
+    try:
+        with open(filename,'rb') as rfile:
+            header=pickle.load(rfile)
+            offset=rfile.tell()
+    except Exception:
+        return None, None
+    if (not isinstance(header,dict) or header.get('format') != 'gathoderesultcache'
+        or header.get('formatversion') != '1'):
+        return None, None
+    return header['digest'], offset
+
+def readResultCacheEntries(filename,offset):
+    """
+    Read the results of a result cache.
+
+    :param filename: Name of the result cache file.
+    :type filename: str
+    :param offset: Offset of the results (see :py:func:`readResultCacheHeader`).
+    :type offset: int
+
+    :return: list -- the results (see :py:func:`writeResultCache`).
+    """
+    with open(filename,'rb') as rfile:
+        rfile.seek(offset)
+        return pickle.load(rfile)
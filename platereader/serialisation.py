@@ -0,0 +1,332 @@
+"""
+This module implements the binary container used by version 2 of the GAT file format and the compression of files.
+
+Growth Analysis Tool for High-throughput Optical Density Experiments
+(GATHODE) binary serialisation.
+
+The container consists of
+
+* the magic bytes ``GATHODEB``,
+* the length of the header (unsigned 32 bit integer, little endian),
+* the header: a JSON encoded dictionary, in which arrays are replaced
+  by their description (dtype, shape and offset),
+* the arrays as raw (little endian) binary blobs, each starting at a
+  multiple of 8 bytes relative to the end of the header.
+
+A container that is written to a file without compression can be
+memory-mapped (see :py:func:`mapBinary`), the arrays are then only
+read from disk when they are accessed.
+
+GAT and CLS files are compressed with one of the codecs in
+:py:data:`compressions` (see :py:func:`writeCompressed`). The codec
+is recognised by the magic bytes each of them starts the file with,
+so files are read with :py:func:`readCompressed` regardless of the
+codec.
+"""
+
+# GATHODE  Growth Analysis Tool
+#          for High-throughput Optical Density Experiments
+#
+# Copyright (C) 2014 Nils Christian
+#
+# This file is part of GATHODE.
+#
+# GATHODE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# GATHODE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with GATHODE.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import struct
+import bz2
+import zlib
+import numpy
+try:
+    import lzma
+except ImportError:
+    # Python 2
+    lzma=None
+
+binaryMagic=b'GATHODEB'
+
+# available codecs (None: no compression)
+compressions=['bz2','gzip','zlib','lzma',None]
+
+def compressionOfData(data):
+    """
+    Return the codec the data is compressed with.
+
+    :param data: The beginning of a file (at least 6 bytes).
+    :type data: bytes
+
+    :return: str -- one of :py:data:`compressions`.
+    """
+    if data[:3] == b'BZh':
+        return 'bz2'
+    if data[:2] == b'\x1f\x8b':
+        return 'gzip'
+    if data[:6] == b'\xfd7zXZ\x00':
+        return 'lzma'
+    # zlib header: deflate method and header checksum
+    if (len(data) >= 2 and bytearray(data[:1])[0] & 0x0f == 8
+        and (bytearray(data[:1])[0]*256+bytearray(data[1:2])[0]) % 31 == 0):
+        return 'zlib'
+    return None
+
+def compressionOfFile(filename):
+    """
+    Return the codec the file is compressed with.
+
+    :param filename: Name of the file.
+    :type filename: str
+
+    :return: str -- one of :py:data:`compressions`.
+    """
+    with open(filename,'rb') as rfile:
+        return compressionOfData(rfile.read(8))
+
+def readCompressed(filename):
+    """
+    Read and decompress a file.
+
+    :param filename: Name of the file.
+    :type filename: str
+
+    :return: bytes -- the uncompressed content.
+    """
+    with open(filename,'rb') as rfile:
+        data=rfile.read()
+    compression=compressionOfData(data[:8])
+    if compression == 'bz2':
+        return bz2.decompress(data)
+    if compression == 'gzip':
+        return zlib.decompress(data,16+zlib.MAX_WBITS)
+    if compression == 'zlib':
+        return zlib.decompress(data)
+    if compression == 'lzma':
+        if lzma is None:
+            raise RuntimeError('lzma compressed files are not supported by this Python version')
+        return lzma.decompress(data)
+    return data
+
+def readCompressedHead(filename,size):
+    """
+    Read and decompress the beginning of a file.
+
+    :param filename: Name of the file.
+    :type filename: str
+    :param size: Number of (uncompressed) bytes that are needed.
+    :type size: int
+
+    :return: bytes -- at least size bytes of the uncompressed content (less if the file is shorter).
+
+    Only as much of the file is read and decompressed as is needed.
+    """
+    with open(filename,'rb') as rfile:
+        chunk=rfile.read(max(size,8))
+        compression=compressionOfData(chunk)
+        if compression is None:
+            return chunk
+        if compression == 'bz2':
+            decompressor=bz2.BZ2Decompressor()
+        elif compression == 'gzip':
+            decompressor=zlib.decompressobj(16+zlib.MAX_WBITS)
+        elif compression == 'zlib':
+            decompressor=zlib.decompressobj()
+        else:
+            if lzma is None:
+                raise RuntimeError('lzma compressed files are not supported by this Python version')
+            decompressor=lzma.LZMADecompressor()
+        head=[]
+        headSize=0
+        while len(chunk):
+            data=decompressor.decompress(chunk)
+            head.append(data)
+            headSize+=len(data)
+            if headSize >= size:
+                break
+            chunk=rfile.read(65536)
+    return b''.join(head)
+
+def writeCompressed(filename,data,compression='bz2',level=None):
+    """
+    Compress data and write it to a file.
+
+    :param filename: Name of the file.
+    :type filename: str
+    :param data: The content.
+    :type data: bytes
+    :param compression: The codec, one of :py:data:`compressions`.
+    :type compression: str
+    :param level: Compression level from 0 (bz2: 1) to 9, defaults to 9 for bz2 and gzip and to 6 for zlib and lzma.
+    :type level: int
+
+    Lower levels compress faster, gzip and zlib at low levels are
+    by far the fastest codecs, lzma at high levels compresses best.
+    """
+    if compression not in compressions:
+        raise RuntimeError('unknown compression "'+str(compression)+'", should be one of '
+                           +', '.join([str(c) for c in compressions]))
+    if level is not None and (level < 0 or level > 9):
+        raise RuntimeError('compression level should be between 0 and 9')
+    if compression == 'bz2':
+        data=bz2.compress(data,max(level,1) if level is not None else 9)
+    elif compression == 'gzip':
+        # (there is no gzip.compress in Python 2)
+        compressor=zlib.compressobj(level if level is not None else 9,zlib.DEFLATED,16+zlib.MAX_WBITS)
+        data=compressor.compress(data)+compressor.flush()
+    elif compression == 'zlib':
+        data=zlib.compress(data,level if level is not None else 6)
+    elif compression == 'lzma':
+        if lzma is None:
+            raise RuntimeError('lzma compression is not supported by this Python version')
+        data=lzma.compress(data,preset=level if level is not None else 6)
+    with open(filename,'wb') as wfile:
+        wfile.write(data)
+
+def isBinary(data):
+    """
+    Return True if data is a binary container.
+
+    :param data: (Uncompressed) content of a file.
+    :type data: bytes
+    """
+    return data[:len(binaryMagic)] == binaryMagic
+
+def packBinary(sr):
+    """
+    Pack a serialisation into a binary container.
+
+    :param sr: The serialisation, values that are numpy arrays are stored as binary blobs.
+    :type sr: dict
+
+    :return: bytes -- the container.
+    """
+    header={}
+    arrays={}
+    blobs=[]
+    offset=0
+    for key in sr:
+        if isinstance(sr[key],numpy.ndarray):
+            arr=numpy.ascontiguousarray(sr[key],dtype=sr[key].dtype.newbyteorder('<'))
+            arrays[key]={'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+            blob=arr.tobytes()
+            blobs.append(blob)
+            offset+=len(blob)
+            padding=-offset % 8
+            blobs.append(b'\0'*padding)
+            offset+=padding
+        else:
+            header[key]=sr[key]
+    header['arrays']=arrays
+    headerBytes=json.dumps(header).encode('utf-8')
+    headerBytes+=b' '*(-(len(binaryMagic)+4+len(headerBytes)) % 8)
+    return b''.join([binaryMagic,struct.pack('<I',len(headerBytes)),headerBytes]+blobs)
+
+def unpackBinaryHeader(data):
+    """
+    Unpack the header of a binary container.
+
+    :param data: The container (or at least its beginning).
+    :type data: bytes
+
+    :return: dict, int -- the header and the offset of the arrays.
+    """
+    if not isBinary(data):
+        raise ValueError('not a binary GATHODE container')
+    start=len(binaryMagic)+4
+    headerLength=struct.unpack('<I',data[len(binaryMagic):start])[0]
+    if len(data) < start+headerLength:
+        raise ValueError('truncated binary GATHODE container')
+    header=json.loads(data[start:start+headerLength].decode('utf-8'))
+    return header, start+headerLength
+
+def readBinaryHeader(filename):
+    """
+    Read the header of a binary container stored (possibly compressed) in a file.
+
+    :param filename: Name of the file.
+    :type filename: str
+
+    :return: dict -- the header without the description of the arrays, None if this is not a binary container.
+
+    Only the beginning of the file is read and decompressed.
+    """
+    start=len(binaryMagic)+4
+    head=readCompressedHead(filename,start)
+    if not isBinary(head):
+        return None
+    if len(head) < start:
+        raise ValueError('truncated binary GATHODE container')
+    headerLength=struct.unpack('<I',head[len(binaryMagic):start])[0]
+    header, dataOffset = unpackBinaryHeader(readCompressedHead(filename,start+headerLength))
+    del header['arrays']
+    return header
+
+def mapBinary(filename):
+    """
+    Memory-map the arrays of a binary container stored (uncompressed) in a file.
+
+    :param filename: Name of the file.
+    :type filename: str
+
+    :return: dict -- the serialisation, arrays are read-only numpy.memmap objects.
+    """
+    with open(filename,'rb') as rfile:
+        start=rfile.read(len(binaryMagic)+4)
+        if not isBinary(start) or len(start) < len(binaryMagic)+4:
+            raise ValueError('not a binary GATHODE container')
+        headerLength=struct.unpack('<I',start[len(binaryMagic):])[0]
+        header, dataOffset = unpackBinaryHeader(start+rfile.read(headerLength))
+        rfile.seek(0,2)
+        fileSize=rfile.tell()
+    sr={}
+    for key in header:
+        if key != 'arrays':
+            sr[key]=header[key]
+    for key in header['arrays']:
+        desc=header['arrays'][key]
+        dtype=numpy.dtype(desc['dtype'])
+        count=int(numpy.prod(desc['shape'])) if len(desc['shape']) else 1
+        if dataOffset+desc['offset']+count*dtype.itemsize > fileSize:
+            raise ValueError('truncated binary GATHODE container')
+        if count == 0:
+            # an empty file region cannot be mapped
+            sr[key]=numpy.zeros(desc['shape'],dtype=dtype)
+            continue
+        sr[key]=numpy.memmap(filename,dtype=dtype,mode='r',offset=dataOffset+desc['offset'],shape=tuple(desc['shape']))
+    return sr
+
+def unpackBinary(data):
+    """
+    Unpack a binary container.
+
+    :param data: The container.
+    :type data: bytes
+
+    :return: dict -- the serialisation.
+
+    The arrays are read-only views into data (no copies are made).
+    """
+    header, dataOffset = unpackBinaryHeader(data)
+    sr={}
+    for key in header:
+        if key != 'arrays':
+            sr[key]=header[key]
+    for key in header['arrays']:
+        desc=header['arrays'][key]
+        dtype=numpy.dtype(desc['dtype'])
+        count=int(numpy.prod(desc['shape'])) if len(desc['shape']) else 1
+        if dataOffset+desc['offset']+count*dtype.itemsize > len(data):
+            raise ValueError('truncated binary GATHODE container')
+        arr=numpy.frombuffer(data,dtype=dtype,count=count,offset=dataOffset+desc['offset'])
+        sr[key]=arr.reshape(desc['shape'])
+    return sr
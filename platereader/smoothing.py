@@ -0,0 +1,180 @@
+"""
+This module implements batched smoothing splines for GATHODE.
+
+Growth Analysis Tool for High-throughput Optical Density Experiments
+(GATHODE) smoothing splines of many time series sharing the same
+timepoints (e.g. all wells of a plate) at once.
+"""
+
+# GATHODE  Growth Analysis Tool
+#          for High-throughput Optical Density Experiments
+#
+# Copyright (C) 2014 Nils Christian
+#
+# This file is part of GATHODE.
+#
+# GATHODE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# GATHODE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with GATHODE.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+import scipy.linalg
+from scipy.interpolate import splev
+
+# upper limit of the number of interior knots (shared by all time series)
+_maxInteriorKnots=40
+# number of bisection steps of log(p) (far below the precision of the residual)
+_bisectionSteps=64
+
+class SmoothingSplineBasis(object):
+    """
+    Smoothing splines of time series that share the same timepoints.
+
+    The smoothing criterion is the one of FITPACK (and therefore of
+    scipy.interpolate.UnivariateSpline): of the splines of degree k
+    with :math:`\\sum_i (y_i - g(t_i))^2 \\le s` the one with the
+    smallest sum of squared jumps of the k-th derivative at the
+    interior knots is chosen. FITPACK places as few knots as
+    possible for each time series. Here all time series share the
+    same knots (at evenly spaced timepoints), so the least-squares
+    problem is factorised once: the B-spline basis is orthonormalised
+    and the jump penalty diagonalised in it (Demmler-Reinsch basis).
+    All time series are then projected onto this basis in one matrix
+    product and the smoothing parameter p satisfying the smoothing
+    condition is searched for all of them simultaneously.
+    """
+
+    def __init__(self,time,k,numInteriorKnots=None):
+        """
+        Constructor.
+
+        :param time: timepoints (strictly increasing)
+        :type time: numpy.array(float)
+        :param k: degree of the smoothing spline
+        :type k: int
+        :param numInteriorKnots: number of interior knots, defaults to a quarter of the timepoints (at most 40)
+        :type numInteriorKnots: int
+        """
+        self.time=numpy.array(time,dtype=float)
+        self.k=k
+        self.unsupported=None
+        n=self.time.shape[0]
+        if k < 1 or k > 5:
+            self.unsupported='degree of smoothing spline is not within [1,5]'
+        elif n <= k:
+            self.unsupported='too few timepoints for degree of smoothing spline'
+        elif not (numpy.diff(self.time) > 0).all():
+            self.unsupported='timepoints are not strictly increasing'
+        if self.unsupported is not None:
+            return
+        if numInteriorKnots is None:
+            numInteriorKnots=min(_maxInteriorKnots,n//4)
+        # the number of coefficients must not exceed the number of timepoints
+        numInteriorKnots=max(0,min(numInteriorKnots,n-k-1))
+        knotIndices=numpy.round(numpy.linspace(0,n-1,numInteriorKnots+2)).astype(int)
+        self.interiorKnots=self.time[knotIndices[1:-1]]
+        self._penalties, self._basis = SmoothingSplineBasis._demmlerReinschBasis(self.time,k,self.interiorKnots)
+
+    @staticmethod
+    def _demmlerReinschBasis(x,k,interiorKnots):
+        """
+        Return the penalties (ascending) and orthonormal basis vectors (at the timepoints) of the splines.
+
+        For internal use only.
+
+        :return: numpy.array(float), numpy.array(float) -- penalties, basis (timepoints x number of coefficients)
+        """
+        knots=numpy.concatenate([[x[0]]*(k+1),interiorKnots,[x[-1]]*(k+1)])
+        numCoeffs=knots.shape[0]-k-1
+        # the k-th derivative is constant between knots, evaluated at the midpoints
+        breakpoints=numpy.concatenate([[x[0]],interiorKnots,[x[-1]]])
+        midpoints=(breakpoints[:-1]+breakpoints[1:])/2.
+        basis=numpy.empty([x.shape[0],numCoeffs])
+        jumps=numpy.empty([interiorKnots.shape[0],numCoeffs])
+        for i in range(numCoeffs):
+            coeffs=numpy.zeros([numCoeffs])
+            coeffs[i]=1.
+            basis[:,i]=splev(x,(knots,coeffs,k))
+            derivative=splev(midpoints,(knots,coeffs,k),der=k)
+            jumps[:,i]=derivative[1:]-derivative[:-1]
+        # orthonormalise the basis: basis.T*basis = L*L.T
+        lower=numpy.linalg.cholesky(numpy.dot(basis.T,basis))
+        linv=scipy.linalg.solve_triangular(lower,numpy.eye(numCoeffs),lower=True)
+        penalty=numpy.dot(linv,numpy.dot(numpy.dot(jumps.T,jumps),linv.T))
+        penalties, eigenvectors = numpy.linalg.eigh((penalty+penalty.T)/2.)
+        # polynomials of degree k have no jumps
+        penalties[:k+1]=0.
+        return penalties, numpy.dot(basis,numpy.dot(linv.T,eigenvectors))
+
+    def smooth(self,values,s):
+        """
+        Return the smoothing splines of the given time series at the timepoints.
+
+        :param values: one time series per row
+        :type values: numpy.array(float)
+        :param s: smoothing factor (upper limit of the sum of squared residuals)
+        :type s: float
+
+        :return: numpy.array(float), list(str) -- smoothed time series (one per row), reason why a time series could not be smoothed (None if it was)
+
+        Time series that cannot be smoothed are nan. This is the
+        case if they contain non-finite values or if even the
+        least-squares spline with the shared knots does not fulfil
+        the smoothing condition (FITPACK would add knots then).
+        """
+        values=numpy.asarray(values,dtype=float)
+        numSeries=values.shape[0]
+        smoothed=numpy.empty(values.shape)
+        smoothed.fill(numpy.nan)
+        if self.unsupported is not None:
+            return smoothed, [self.unsupported]*numSeries
+        if s is None or s < 0:
+            return smoothed, ['smoothing factor is not a non-negative number']*numSeries
+        messages=[None]*numSeries
+        finite=numpy.isfinite(values).all(axis=1)
+        for i in numpy.nonzero(~finite)[0]:
+            messages[i]='time series contains non-finite values'
+
+        z=numpy.dot(values[finite],self._basis)
+        leastSquares=values[finite]-numpy.dot(z,self._basis.T)
+        leastSquaresResidual=(leastSquares*leastSquares).sum(axis=1)
+        fulfilled=leastSquaresResidual <= s
+        for i in numpy.nonzero(finite)[0][~fulfilled]:
+            messages[i]='least-squares spline with '+str(self.interiorKnots.shape[0])+' interior knots does not fulfil smoothing condition'
+        z=z[fulfilled]
+        leastSquaresResidual=leastSquaresResidual[fulfilled]
+
+        d=self._penalties
+        penalised=d > 0
+        z2=z*z
+        shrink=numpy.empty(z.shape)
+        shrink[:]=~penalised
+        if penalised.any():
+            # residual for p -> infinity (least-squares polynomial of degree k)
+            polynomialResidual=leastSquaresResidual+z2[:,penalised].sum(axis=1)
+            # the residual increases with p: leastSquaresResidual + sum((p*d/(1+p*d))**2 * z**2)
+            lower=numpy.empty([z.shape[0]])
+            lower.fill(numpy.log(1e-3/d[-1]))
+            upper=numpy.empty([z.shape[0]])
+            upper.fill(numpy.log(1e3/d[penalised][0]))
+            for step in range(_bisectionSteps):
+                middle=(lower+upper)/2.
+                pd=numpy.exp(middle)[:,numpy.newaxis]*d
+                residual=leastSquaresResidual+((pd/(1.+pd))**2*z2).sum(axis=1)
+                tooSmooth=residual > s
+                upper[tooSmooth]=middle[tooSmooth]
+                lower[~tooSmooth]=middle[~tooSmooth]
+            notPolynomial=polynomialResidual > s
+            shrink[notPolynomial]=1./(1.+numpy.exp((lower[notPolynomial]+upper[notPolynomial])/2.)[:,numpy.newaxis]*d)
+        smoothedIdcs=numpy.nonzero(finite)[0][fulfilled]
+        smoothed[smoothedIdcs]=numpy.dot(z*shrink,self._basis.T)
+        return smoothed, messages